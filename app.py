@@ -1,5 +1,6 @@
 import streamlit as st
-from PIL import Image
+from utils.images import image_for
+from utils.warmup import WARMUP_ENABLED, render_warmup_status, start_warmup
 
 # ======================
 # PAGE CONFIG
@@ -10,6 +11,13 @@ st.set_page_config(
     layout="wide"
 )
 
+# ======================
+# CACHE WARM-UP
+# ======================
+if WARMUP_ENABLED:
+    start_warmup()
+render_warmup_status()
+
 # ======================
 # HERO SECTION
 # ======================
@@ -117,9 +125,8 @@ This layered structure mirrors professional Business Intelligence architecture.
 st.header("📷 Dashboard Preview")
 
 try:
-    image = Image.open("images/Dashboard_1.png")
-    st.image(image, use_container_width=True)
-except:
+    st.image(image_for("Dashboard_1.png"), use_container_width=True)
+except OSError:
     st.info("Preview image not available.")
 
 # ======================
@@ -1,17 +1,35 @@
 import streamlit as st
-import pandas as pd
 import plotly.express as px
-from pathlib import Path
+from utils.charts import box_chart, box_summary
+from utils.cube import MEASURES, mean, summarize
+from utils.data_loader import load_data
+from utils.figure_cache import cached_figure, render_figure_cache_stats
+from utils.filter_index import filtered_rows
+from utils.filters import filter_multiselect, tenure_slider
+from utils.partitions import load_filter_columns, partitioned_reads, select_partitions
+from utils.profiler import plotly_chart, render_performance_panel, start_rerun, timed
+from utils.query import aggregate
+from utils.refresh import use_current_dataset
 
 # ======================================================
 # PAGE CONFIGURATION
 # ======================================================
+PAGE_ID = "executive_overview"
+
+# Columns read from the partitioned store (CHURN_PARTITIONED_READS): for the
+# sidebar, and per filter state for the KPIs and charts.
+FILTER_COLUMNS = ["contract", "internet_service", "state", "tenure_in_months"]
+PARTITION_COLUMNS = MEASURES + ["contract", "churn_label", "customer_status", "customer_id"]
+
 st.set_page_config(
     page_title="Executive Overview",
     page_icon="📊",
     layout="wide"
 )
 
+start_rerun(PAGE_ID)
+use_current_dataset()
+
 st.title("📊 Customer Churn Intelligence Dashboard")
 st.markdown("### Executive-Level Business Overview for Strategic Decision Making")
 
@@ -24,69 +42,52 @@ Designed for stakeholders and decision-makers.
 # ======================================================
 # LOAD DATA
 # ======================================================
-@st.cache_data
-def load_data():
-    base_path = Path(__file__).resolve().parent.parent
-    data_path = base_path / "data" / "final_dataset.csv"
-    df = pd.read_csv(data_path)
-    df.columns = df.columns.str.lower().str.strip()
-    return df
-
-df = load_data()
+with timed("load"):
+    partitioned = partitioned_reads()
+    df = load_filter_columns(FILTER_COLUMNS) if partitioned else load_data()
 
 # ======================================================
 # SIDEBAR FILTERS
 # ======================================================
 st.sidebar.header("🔎 Executive Filters")
 
-contract_filter = st.sidebar.multiselect(
-    "Contract Type",
-    options=df["contract"].unique(),
-    default=df["contract"].unique()
-)
+contract_filter = filter_multiselect(df, "contract", "Contract Type")
 
-internet_filter = st.sidebar.multiselect(
-    "Internet Service",
-    options=df["internet_service"].unique(),
-    default=df["internet_service"].unique()
-)
+internet_filter = filter_multiselect(df, "internet_service", "Internet Service")
 
-state_filter = st.sidebar.multiselect(
-    "State",
-    options=df["state"].unique(),
-    default=df["state"].unique()
-)
+state_filter = filter_multiselect(df, "state", "State")
 
-tenure_range = st.sidebar.slider(
-    "Tenure (Months)",
-    int(df["tenure_in_months"].min()),
-    int(df["tenure_in_months"].max()),
-    (
-        int(df["tenure_in_months"].min()),
-        int(df["tenure_in_months"].max())
-    )
-)
+tenure_range = tenure_slider(df)
 
 # ======================================================
 # APPLY FILTERS
 # ======================================================
-filtered_df = df[
-    (df["contract"].isin(contract_filter)) &
-    (df["internet_service"].isin(internet_filter)) &
-    (df["state"].isin(state_filter)) &
-    (df["tenure_in_months"].between(tenure_range[0], tenure_range[1]))
-]
+selections = {
+    "contract": contract_filter,
+    "internet_service": internet_filter,
+    "state": state_filter,
+}
+
+with timed("filter"):
+    if partitioned:
+        rows, partition_df = select_partitions(selections, tenure_range, PARTITION_COLUMNS)
+    else:
+        rows, partition_df = filtered_rows(selections, tenure_range), None
+
+filter_state = {**selections, "tenure_range": tenure_range}
 
 # ======================================================
 # KPI SECTION
 # ======================================================
 st.subheader("📌 Key Performance Indicators")
 
-total_customers = filtered_df["customer_id"].nunique()
-total_churn = filtered_df[filtered_df["churn_label"] == "Yes"].shape[0]
+kpis = summarize(rows, selections, tenure_range, df=partition_df)
+
+total_customers = int(kpis["count"])
+total_churn = int(kpis["churn_value_sum"])
 churn_rate = (total_churn / total_customers) * 100 if total_customers > 0 else 0
-total_revenue = filtered_df["total_revenue"].sum()
-avg_cltv = filtered_df["cltv"].mean() if total_customers > 0 else 0
+total_revenue = kpis["total_revenue_sum"]
+avg_cltv = mean(kpis, "cltv") if total_customers > 0 else 0
 
 col1, col2, col3, col4, col5 = st.columns(5)
 
@@ -106,32 +107,42 @@ col1, col2 = st.columns(2)
 with col1:
     st.subheader("Customer Status Distribution")
 
-    fig_status = px.pie(
-        filtered_df,
-        names="customer_status",
-        hole=0.5
-    )
+    def build_status():
+        status_counts = aggregate(
+            rows, "customer_status", {"count": ("customer_id", "count")},
+            df=partition_df
+        )
+
+        return px.pie(
+            status_counts,
+            names="customer_status",
+            values="count",
+            hole=0.5
+        )
+
+    fig_status = cached_figure(PAGE_ID, "status", filter_state, build_status)
 
-    st.plotly_chart(fig_status, use_container_width=True)
+    plotly_chart(fig_status, use_container_width=True)
 
 with col2:
     st.subheader("Churn by Contract Type")
 
-    contract_churn = (
-        filtered_df.groupby(["contract", "churn_label"])
-        .size()
-        .reset_index(name="count")
-    )
+    def build_contract():
+        contract_churn = summarize(
+            rows, selections, tenure_range, by=["contract", "churn_label"], df=partition_df
+        )
 
-    fig_contract = px.bar(
-        contract_churn,
-        x="contract",
-        y="count",
-        color="churn_label",
-        barmode="group"
-    )
+        return px.bar(
+            contract_churn,
+            x="contract",
+            y="count",
+            color="churn_label",
+            barmode="group"
+        )
 
-    st.plotly_chart(fig_contract, use_container_width=True)
+    fig_contract = cached_figure(PAGE_ID, "contract", filter_state, build_contract)
+
+    plotly_chart(fig_contract, use_container_width=True)
 
 st.divider()
 
@@ -143,31 +154,39 @@ col1, col2 = st.columns(2)
 with col1:
     st.subheader("Revenue by Contract")
 
-    revenue_contract = (
-        filtered_df.groupby("contract")["total_revenue"]
-        .sum()
-        .reset_index()
-        .sort_values(by="total_revenue", ascending=False)
-    )
+    def build_revenue():
+        revenue_contract = (
+            summarize(rows, selections, tenure_range, by="contract", df=partition_df)
+            .rename(columns={"total_revenue_sum": "total_revenue"})
+            .sort_values(by="total_revenue", ascending=False)
+        )
+
+        return px.bar(
+            revenue_contract,
+            x="contract",
+            y="total_revenue"
+        )
 
-    fig_revenue = px.bar(
-        revenue_contract,
-        x="contract",
-        y="total_revenue"
-    )
+    fig_revenue = cached_figure(PAGE_ID, "revenue", filter_state, build_revenue)
 
-    st.plotly_chart(fig_revenue, use_container_width=True)
+    plotly_chart(fig_revenue, use_container_width=True)
 
 with col2:
     st.subheader("Tenure vs Churn Behavior")
 
-    fig_tenure = px.box(
-        filtered_df,
-        x="churn_label",
-        y="tenure_in_months"
-    )
+    def build_tenure():
+        return box_chart(
+            box_summary(
+                "churn_label", "tenure_in_months", selections, tenure_range,
+                partitioned=partitioned
+            ),
+            x="churn_label",
+            y="tenure_in_months"
+        )
 
-    st.plotly_chart(fig_tenure, use_container_width=True)
+    fig_tenure = cached_figure(PAGE_ID, "tenure", filter_state, build_tenure)
+
+    plotly_chart(fig_tenure, use_container_width=True)
 
 st.divider()
 
@@ -185,3 +204,6 @@ st.markdown("""
 """)
 
 st.caption("Data Analyst Portfolio Project – Customer Churn Intelligence")
+
+render_figure_cache_stats()
+render_performance_panel()
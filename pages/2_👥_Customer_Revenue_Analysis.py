@@ -1,17 +1,29 @@
 import streamlit as st
-import pandas as pd
 import plotly.express as px
-from pathlib import Path
+from utils.charts import box_chart, box_summary, figure_note, scatter_chart
+from utils.cube import mean, summarize
+from utils.data_loader import load_data
+from utils.figure_cache import cached_figure, render_figure_cache_stats
+from utils.filter_index import filtered_rows, select_filtered
+from utils.filters import filter_multiselect, tenure_slider
+from utils.profiler import plotly_chart, render_performance_panel, start_rerun, timed
+from utils.refresh import use_current_dataset
+from utils.sections import FILTER_SECTION_CAPTION, fragment, lazy_section
 
 # ======================================================
 # PAGE CONFIGURATION
 # ======================================================
+PAGE_ID = "customer_revenue"
+
 st.set_page_config(
     page_title="Customer & Revenue Analysis",
     page_icon="💰",
     layout="wide"
 )
 
+start_rerun(PAGE_ID)
+use_current_dataset()
+
 st.title("💰 Customer & Revenue Analysis")
 st.markdown("### Revenue Drivers, Customer Segmentation & Profitability Insights")
 
@@ -24,69 +36,48 @@ Designed for business and growth strategy evaluation.
 # ======================================================
 # LOAD DATA
 # ======================================================
-@st.cache_data
-def load_data():
-    base_path = Path(__file__).resolve().parent.parent
-    data_path = base_path / "data" / "final_dataset.csv"
-    df = pd.read_csv(data_path)
-    df.columns = df.columns.str.lower().str.strip()
-    return df
-
-df = load_data()
+with timed("load"):
+    df = load_data()
 
 # ======================================================
 # SIDEBAR FILTERS
 # ======================================================
 st.sidebar.header("🔎 Revenue Filters")
 
-contract_filter = st.sidebar.multiselect(
-    "Contract Type",
-    options=df["contract"].unique(),
-    default=df["contract"].unique()
-)
+contract_filter = filter_multiselect(df, "contract", "Contract Type")
 
-payment_filter = st.sidebar.multiselect(
-    "Payment Method",
-    options=df["payment_method"].unique(),
-    default=df["payment_method"].unique()
-)
+payment_filter = filter_multiselect(df, "payment_method", "Payment Method")
 
-internet_filter = st.sidebar.multiselect(
-    "Internet Service",
-    options=df["internet_service"].unique(),
-    default=df["internet_service"].unique()
-)
+internet_filter = filter_multiselect(df, "internet_service", "Internet Service")
 
-tenure_range = st.sidebar.slider(
-    "Tenure (Months)",
-    int(df["tenure_in_months"].min()),
-    int(df["tenure_in_months"].max()),
-    (
-        int(df["tenure_in_months"].min()),
-        int(df["tenure_in_months"].max())
-    )
-)
+tenure_range = tenure_slider(df)
 
 # ======================================================
 # APPLY FILTERS
 # ======================================================
-filtered_df = df[
-    (df["contract"].isin(contract_filter)) &
-    (df["payment_method"].isin(payment_filter)) &
-    (df["internet_service"].isin(internet_filter)) &
-    (df["tenure_in_months"].between(tenure_range[0], tenure_range[1]))
-]
+selections = {
+    "contract": contract_filter,
+    "payment_method": payment_filter,
+    "internet_service": internet_filter,
+}
+
+with timed("filter"):
+    rows = filtered_rows(selections, tenure_range)
+
+filter_state = {**selections, "tenure_range": tenure_range}
 
 # ======================================================
 # KPI SECTION
 # ======================================================
 st.subheader("📌 Revenue Performance Indicators")
 
-total_revenue = filtered_df["total_revenue"].sum()
-avg_monthly_charge = filtered_df["monthly_charges"].mean()
-avg_cltv = filtered_df["cltv"].mean()
-avg_tenure = filtered_df["tenure_in_months"].mean()
-total_customers = filtered_df["customer_id"].nunique()
+kpis = summarize(rows, selections, tenure_range)
+
+total_revenue = kpis["total_revenue_sum"]
+avg_monthly_charge = mean(kpis, "monthly_charges")
+avg_cltv = mean(kpis, "cltv")
+avg_tenure = mean(kpis, "tenure_in_months")
+total_customers = int(kpis["count"])
 
 col1, col2, col3, col4, col5 = st.columns(5)
 
@@ -106,26 +97,32 @@ col1, col2 = st.columns(2)
 with col1:
     st.subheader("Monthly Charges by Contract")
 
-    fig_monthly = px.box(
-        filtered_df,
-        x="contract",
-        y="monthly_charges",
-        color="contract"
-    )
+    def build_monthly():
+        return box_chart(
+            box_summary("contract", "monthly_charges", selections, tenure_range),
+            x="contract",
+            y="monthly_charges",
+            color=True
+        )
+
+    fig_monthly = cached_figure(PAGE_ID, "monthly", filter_state, build_monthly)
 
-    st.plotly_chart(fig_monthly, use_container_width=True)
+    plotly_chart(fig_monthly, use_container_width=True)
 
 with col2:
     st.subheader("CLTV Distribution by Contract")
 
-    fig_cltv = px.box(
-        filtered_df,
-        x="contract",
-        y="cltv",
-        color="contract"
-    )
+    def build_cltv():
+        return box_chart(
+            box_summary("contract", "cltv", selections, tenure_range),
+            x="contract",
+            y="cltv",
+            color=True
+        )
 
-    st.plotly_chart(fig_cltv, use_container_width=True)
+    fig_cltv = cached_figure(PAGE_ID, "cltv", filter_state, build_cltv)
+
+    plotly_chart(fig_cltv, use_container_width=True)
 
 st.divider()
 
@@ -137,55 +134,76 @@ col1, col2 = st.columns(2)
 with col1:
     st.subheader("Revenue by Payment Method")
 
-    revenue_payment = (
-        filtered_df.groupby("payment_method")["total_revenue"]
-        .sum()
-        .reset_index()
-        .sort_values(by="total_revenue", ascending=False)
-    )
+    def build_payment():
+        revenue_payment = (
+            summarize(rows, selections, tenure_range, by="payment_method")
+            .rename(columns={"total_revenue_sum": "total_revenue"})
+            .sort_values(by="total_revenue", ascending=False)
+        )
+
+        return px.bar(
+            revenue_payment,
+            x="payment_method",
+            y="total_revenue"
+        )
 
-    fig_payment = px.bar(
-        revenue_payment,
-        x="payment_method",
-        y="total_revenue"
-    )
+    fig_payment = cached_figure(PAGE_ID, "payment", filter_state, build_payment)
 
-    st.plotly_chart(fig_payment, use_container_width=True)
+    plotly_chart(fig_payment, use_container_width=True)
 
 with col2:
     st.subheader("Monthly Charges by Internet Service")
 
-    fig_internet = px.box(
-        filtered_df,
-        x="internet_service",
-        y="monthly_charges",
-        color="internet_service"
-    )
+    def build_internet():
+        return box_chart(
+            box_summary("internet_service", "monthly_charges", selections, tenure_range),
+            x="internet_service",
+            y="monthly_charges",
+            color=True
+        )
+
+    fig_internet = cached_figure(PAGE_ID, "internet", filter_state, build_internet)
 
-    st.plotly_chart(fig_internet, use_container_width=True)
+    plotly_chart(fig_internet, use_container_width=True)
 
 st.divider()
 
 # ======================================================
 # TENURE vs CLTV ANALYSIS (ADVANCED SCATTER)
 # ======================================================
-st.subheader("Tenure vs CLTV Relationship")
-
-fig_scatter = px.scatter(
-    filtered_df,
-    x="tenure_in_months",
-    y="cltv",
-    color="contract",
-    size="monthly_charges",
-    hover_data=[
-        "customer_id",
-        "payment_method",
-        "internet_service",
-        "churn_label"
-    ]
-)
+# Below the fold: filtered, sampled and sent only once the section is opened.
+@fragment
+def scatter_section(selections, tenure_range, filter_state):
+    st.subheader("Tenure vs CLTV Relationship")
+
+    if not lazy_section("revenue_scatter", "Show tenure vs CLTV scatter", FILTER_SECTION_CAPTION):
+        return
+
+    def build_scatter():
+        return scatter_chart(
+            select_filtered(df, selections, tenure_range),
+            x="tenure_in_months",
+            y="cltv",
+            color="contract",
+            size="monthly_charges",
+            hover_data=[
+                "customer_id",
+                "payment_method",
+                "internet_service",
+                "churn_label"
+            ]
+        )
 
-st.plotly_chart(fig_scatter, use_container_width=True)
+    fig_scatter = cached_figure(PAGE_ID, "scatter", filter_state, build_scatter)
+
+    plotly_chart(fig_scatter, use_container_width=True)
+
+    scatter_note = figure_note(fig_scatter)
+
+    if scatter_note:
+        st.caption(scatter_note)
+
+scatter_section(selections, tenure_range, filter_state)
 
 st.divider()
 
@@ -203,3 +221,6 @@ st.markdown("""
 """)
 
 st.caption("Customer Churn Intelligence Dashboard – Revenue Deep Dive")
+
+render_figure_cache_stats()
+render_performance_panel()
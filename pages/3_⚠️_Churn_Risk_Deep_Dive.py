@@ -1,17 +1,30 @@
 import streamlit as st
-import pandas as pd
 import plotly.express as px
-from pathlib import Path
+from utils.charts import box_chart, box_summary, histogram_chart
+from utils.cube import histogram, mean, summarize
+from utils.data_loader import load_data
+from utils.figure_cache import cached_figure, render_figure_cache_stats
+from utils.filter_index import filtered_rows
+from utils.filters import filter_multiselect
+from utils.profiler import plotly_chart, render_performance_panel, start_rerun, timed
+from utils.query import aggregate
+from utils.refresh import use_current_dataset
+from utils.schema import flag_labels
 
 # ======================================================
 # PAGE CONFIGURATION
 # ======================================================
+PAGE_ID = "churn_risk"
+
 st.set_page_config(
     page_title="Churn Risk Deep Dive",
     page_icon="⚠️",
     layout="wide"
 )
 
+start_rerun(PAGE_ID)
+use_current_dataset()
+
 st.title("⚠️ Churn Risk Deep Dive")
 st.markdown("### Behavioral & Service-Level Churn Risk Analysis")
 
@@ -24,55 +37,43 @@ Designed to uncover actionable retention insights.
 # ======================================================
 # LOAD DATA
 # ======================================================
-@st.cache_data
-def load_data():
-    base_path = Path(__file__).resolve().parent.parent
-    data_path = base_path / "data" / "final_dataset.csv"
-    df = pd.read_csv(data_path)
-    df.columns = df.columns.str.lower().str.strip()
-    return df
-
-df = load_data()
+with timed("load"):
+    df = load_data()
 
 # ======================================================
 # SIDEBAR FILTERS
 # ======================================================
 st.sidebar.header("🔎 Churn Risk Filters")
 
-contract_filter = st.sidebar.multiselect(
-    "Contract Type",
-    options=df["contract"].unique(),
-    default=df["contract"].unique()
-)
+contract_filter = filter_multiselect(df, "contract", "Contract Type")
 
-internet_filter = st.sidebar.multiselect(
-    "Internet Service",
-    options=df["internet_service"].unique(),
-    default=df["internet_service"].unique()
-)
+internet_filter = filter_multiselect(df, "internet_service", "Internet Service")
 
-churn_filter = st.sidebar.multiselect(
-    "Churn Label",
-    options=df["churn_label"].unique(),
-    default=df["churn_label"].unique()
-)
+churn_filter = filter_multiselect(df, "churn_label", "Churn Label")
+
+selections = {
+    "contract": contract_filter,
+    "internet_service": internet_filter,
+    "churn_label": churn_filter,
+}
+
+with timed("filter"):
+    rows = filtered_rows(selections)
 
-filtered_df = df[
-    (df["contract"].isin(contract_filter)) &
-    (df["internet_service"].isin(internet_filter)) &
-    (df["churn_label"].isin(churn_filter))
-]
+filter_state = selections
 
 # ======================================================
 # KPI SECTION
 # ======================================================
 st.subheader("📌 Churn Risk Indicators")
 
-total_customers = filtered_df["customer_id"].nunique()
-churned_customers = filtered_df[filtered_df["churn_label"] == "Yes"].shape[0]
+kpis = summarize(rows, selections)
+
+total_customers = int(kpis["count"])
+churned_customers = int(kpis["churn_value_sum"])
 churn_rate = (churned_customers / total_customers) * 100 if total_customers > 0 else 0
-avg_satisfaction = filtered_df["satisfaction_score"].mean()
-avg_churn_score = filtered_df["churn_score"].mean()
+avg_satisfaction = mean(kpis, "satisfaction_score")
+avg_churn_score = mean(kpis, "churn_score")
 
 col1, col2, col3, col4, col5 = st.columns(5)
 
@@ -92,33 +93,35 @@ col1, col2 = st.columns(2)
 with col1:
     st.subheader("Churn Rate by Contract")
 
-    churn_contract = (
-        filtered_df.groupby("contract")["churn_value"]
-        .mean()
-        .reset_index()
-    )
+    def build_contract():
+        churn_contract = summarize(rows, selections, by="contract")
+
+        churn_contract["churn_rate"] = mean(churn_contract, "churn_value") * 100
 
-    churn_contract["churn_rate"] = churn_contract["churn_value"] * 100
+        return px.bar(
+            churn_contract,
+            x="contract",
+            y="churn_rate"
+        )
 
-    fig_contract = px.bar(
-        churn_contract,
-        x="contract",
-        y="churn_rate"
-    )
+    fig_contract = cached_figure(PAGE_ID, "contract", filter_state, build_contract)
 
-    st.plotly_chart(fig_contract, use_container_width=True)
+    plotly_chart(fig_contract, use_container_width=True)
 
 with col2:
     st.subheader("Satisfaction vs Churn")
 
-    fig_satisfaction = px.box(
-        filtered_df,
-        x="churn_label",
-        y="satisfaction_score",
-        color="churn_label"
-    )
+    def build_satisfaction():
+        return box_chart(
+            box_summary("churn_label", "satisfaction_score", selections),
+            x="churn_label",
+            y="satisfaction_score",
+            color=True
+        )
 
-    st.plotly_chart(fig_satisfaction, use_container_width=True)
+    fig_satisfaction = cached_figure(PAGE_ID, "satisfaction", filter_state, build_satisfaction)
+
+    plotly_chart(fig_satisfaction, use_container_width=True)
 
 st.divider()
 
@@ -130,40 +133,50 @@ col1, col2 = st.columns(2)
 with col1:
     st.subheader("Online Security vs Churn")
 
-    security_churn = (
-        filtered_df.groupby(["online_security", "churn_label"])
-        .size()
-        .reset_index(name="count")
-    )
+    def build_security():
+        security_churn = aggregate(
+            rows,
+            ["online_security", "churn_label"],
+            {"count": ("customer_id", "count")}
+        )
+
+        security_churn["online_security"] = flag_labels(security_churn["online_security"])
+
+        return px.bar(
+            security_churn,
+            x="online_security",
+            y="count",
+            color="churn_label",
+            barmode="group"
+        )
 
-    fig_security = px.bar(
-        security_churn,
-        x="online_security",
-        y="count",
-        color="churn_label",
-        barmode="group"
-    )
+    fig_security = cached_figure(PAGE_ID, "security", filter_state, build_security)
 
-    st.plotly_chart(fig_security, use_container_width=True)
+    plotly_chart(fig_security, use_container_width=True)
 
 with col2:
     st.subheader("Tech Support vs Churn")
 
-    support_churn = (
-        filtered_df.groupby(["premium_tech_support", "churn_label"])
-        .size()
-        .reset_index(name="count")
-    )
+    def build_support():
+        support_churn = aggregate(
+            rows,
+            ["premium_tech_support", "churn_label"],
+            {"count": ("customer_id", "count")}
+        )
+
+        support_churn["premium_tech_support"] = flag_labels(support_churn["premium_tech_support"])
+
+        return px.bar(
+            support_churn,
+            x="premium_tech_support",
+            y="count",
+            color="churn_label",
+            barmode="group"
+        )
 
-    fig_support = px.bar(
-        support_churn,
-        x="premium_tech_support",
-        y="count",
-        color="churn_label",
-        barmode="group"
-    )
+    fig_support = cached_figure(PAGE_ID, "support", filter_state, build_support)
 
-    st.plotly_chart(fig_support, use_container_width=True)
+    plotly_chart(fig_support, use_container_width=True)
 
 st.divider()
 
@@ -175,33 +188,37 @@ col1, col2 = st.columns(2)
 with col1:
     st.subheader("Churn Category Distribution")
 
-    churn_category = (
-        filtered_df[filtered_df["churn_label"] == "Yes"]
-        .groupby("churn_category")
-        .size()
-        .reset_index(name="count")
-        .sort_values(by="count", ascending=False)
-    )
+    def build_category():
+        churn_category = aggregate(
+            rows,
+            "churn_category",
+            {"count": ("customer_id", "count")},
+            where={"churn_label": ["Yes"]},
+            order_by="count",
+            descending=True
+        )
 
-    fig_category = px.bar(
-        churn_category,
-        x="churn_category",
-        y="count"
-    )
+        return px.bar(
+            churn_category,
+            x="churn_category",
+            y="count"
+        )
 
-    st.plotly_chart(fig_category, use_container_width=True)
+    fig_category = cached_figure(PAGE_ID, "category", filter_state, build_category)
+
+    plotly_chart(fig_category, use_container_width=True)
 
 with col2:
     st.subheader("Churn Score Distribution")
 
-    fig_score = px.histogram(
-        filtered_df,
-        x="churn_score",
-        nbins=30,
-        color="churn_label"
-    )
+    def build_score():
+        score_bins = histogram(rows, "churn_score", "churn_label", selections)
+
+        return histogram_chart(score_bins, x="churn_score", color="churn_label")
 
-    st.plotly_chart(fig_score, use_container_width=True)
+    fig_score = cached_figure(PAGE_ID, "score", filter_state, build_score)
+
+    plotly_chart(fig_score, use_container_width=True)
 
 st.divider()
 
@@ -219,3 +236,6 @@ st.markdown("""
 """)
 
 st.caption("Customer Churn Intelligence Dashboard – Behavioral Risk Analysis")
+
+render_figure_cache_stats()
+render_performance_panel()
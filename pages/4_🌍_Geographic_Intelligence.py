@@ -1,17 +1,37 @@
 import streamlit as st
-import pandas as pd
 import plotly.express as px
-from pathlib import Path
+from utils.charts import box_chart, box_summary
+from utils.cube import MEASURES, mean, summarize
+from utils.data_loader import load_data
+from utils.figure_cache import cached_figure, render_figure_cache_stats
+from utils.filter_index import filtered_rows
+from utils.filters import filter_multiselect
+from utils.geo import DEFAULT_GEO_LEVEL, GEO_LEVELS, GeoIndex, load_geo_index
+from utils.memory import track_frame
+from utils.partitions import load_filter_columns, partitioned_reads, read_partitions
+from utils.profiler import plotly_chart, render_performance_panel, start_rerun, timed
+from utils.refresh import use_current_dataset
+from utils.sections import FILTER_SECTION_CAPTION, fragment, lazy_section
 
 # ======================================================
 # PAGE CONFIGURATION
 # ======================================================
+PAGE_ID = "geographic"
+
+# Columns read from the partitioned store (CHURN_PARTITIONED_READS): for the
+# sidebar, and per filter state for the KPIs, state charts and map.
+FILTER_COLUMNS = ["contract", "churn_label"]
+PARTITION_COLUMNS = MEASURES + ["state", "city", "zip_code", "latitude", "longitude"]
+
 st.set_page_config(
     page_title="Geographic Intelligence",
     page_icon="🌍",
     layout="wide"
 )
 
+start_rerun(PAGE_ID)
+use_current_dataset()
+
 st.title("🌍 Geographic & Regional Intelligence")
 st.markdown("### Regional Revenue Distribution & Churn Exposure Analysis")
 
@@ -24,47 +44,50 @@ Designed to support regional strategy and resource allocation decisions.
 # ======================================================
 # LOAD DATA
 # ======================================================
-@st.cache_data
-def load_data():
-    base_path = Path(__file__).resolve().parent.parent
-    data_path = base_path / "data" / "final_dataset.csv"
-    df = pd.read_csv(data_path)
-    df.columns = df.columns.str.lower().str.strip()
-    return df
-
-df = load_data()
+with timed("load"):
+    partitioned = partitioned_reads()
+    if partitioned:
+        df = load_filter_columns(FILTER_COLUMNS)
+    else:
+        df = load_data()
+        geo_index = load_geo_index()
 
 # ======================================================
 # SIDEBAR FILTERS
 # ======================================================
 st.sidebar.header("🔎 Geographic Filters")
 
-contract_filter = st.sidebar.multiselect(
-    "Contract Type",
-    options=df["contract"].unique(),
-    default=df["contract"].unique()
-)
+contract_filter = filter_multiselect(df, "contract", "Contract Type")
 
-churn_filter = st.sidebar.multiselect(
-    "Churn Label",
-    options=df["churn_label"].unique(),
-    default=df["churn_label"].unique()
-)
+churn_filter = filter_multiselect(df, "churn_label", "Churn Label")
+
+selections = {
+    "contract": contract_filter,
+    "churn_label": churn_filter,
+}
+
+with timed("filter"):
+    if partitioned:
+        # The map bins are built over the rows read, once per filter state.
+        read = read_partitions(selections, columns=PARTITION_COLUMNS)
+        rows, partition_df = read.rows, read.frame
+        geo_index = read.derived("geo index", GeoIndex)
+    else:
+        rows, partition_df = filtered_rows(selections), None
 
-filtered_df = df[
-    (df["contract"].isin(contract_filter)) &
-    (df["churn_label"].isin(churn_filter))
-]
+filter_state = selections
 
 # ======================================================
 # KPI SECTION
 # ======================================================
 st.subheader("📌 Regional Performance Indicators")
 
-total_revenue = filtered_df["total_revenue"].sum()
-total_customers = filtered_df["customer_id"].nunique()
-avg_cltv = filtered_df["cltv"].mean()
-avg_churn_rate = filtered_df["churn_value"].mean() * 100
+kpis = summarize(rows, selections, df=partition_df)
+
+total_revenue = kpis["total_revenue_sum"]
+total_customers = int(kpis["count"])
+avg_cltv = mean(kpis, "cltv")
+avg_churn_rate = mean(kpis, "churn_value") * 100
 
 col1, col2, col3, col4 = st.columns(4)
 
@@ -83,91 +106,131 @@ col1, col2 = st.columns(2)
 with col1:
     st.subheader("Top 10 States by Revenue")
 
+    # Also drives the top-10 state CLTV boxes further down.
     revenue_state = (
-        filtered_df.groupby("state")["total_revenue"]
-        .sum()
-        .reset_index()
+        summarize(rows, selections, by="state", df=partition_df)
+        .rename(columns={"total_revenue_sum": "total_revenue"})
         .sort_values(by="total_revenue", ascending=False)
         .head(10)
     )
+    track_frame("revenue_state", revenue_state)
 
-    fig_revenue = px.bar(
-        revenue_state,
-        x="state",
-        y="total_revenue"
-    )
+    def build_revenue():
+        return px.bar(
+            revenue_state,
+            x="state",
+            y="total_revenue"
+        )
+
+    fig_revenue = cached_figure(PAGE_ID, "revenue", filter_state, build_revenue)
 
-    st.plotly_chart(fig_revenue, use_container_width=True)
+    plotly_chart(fig_revenue, use_container_width=True)
 
 with col2:
     st.subheader("Churn Rate by State (Top 10 by Customers)")
 
-    churn_state = (
-        filtered_df.groupby("state")
-        .agg(
-            customers=("customer_id", "count"),
-            churn_rate=("churn_value", "mean")
+    def build_churn():
+        churn_state = (
+            summarize(rows, selections, by="state", df=partition_df)
+            .rename(columns={"count": "customers"})
+            .sort_values(by="customers", ascending=False)
+            .head(10)
         )
-        .reset_index()
-        .sort_values(by="customers", ascending=False)
-        .head(10)
-    )
 
-    churn_state["churn_rate"] = churn_state["churn_rate"] * 100
+        churn_state["churn_rate"] = (
+            churn_state["churn_value_sum"] / churn_state["customers"] * 100
+        )
 
-    fig_churn = px.bar(
-        churn_state,
-        x="state",
-        y="churn_rate"
-    )
+        return px.bar(
+            churn_state,
+            x="state",
+            y="churn_rate"
+        )
+
+    fig_churn = cached_figure(PAGE_ID, "churn", filter_state, build_churn)
 
-    st.plotly_chart(fig_churn, use_container_width=True)
+    plotly_chart(fig_churn, use_container_width=True)
 
 st.divider()
 
 # ======================================================
 # GEO SCATTER MAP
 # ======================================================
-st.subheader("Customer Geographic Distribution")
-
-fig_map = px.scatter_mapbox(
-    filtered_df,
-    lat="latitude",
-    lon="longitude",
-    color="churn_label",
-    size="monthly_charges",
-    hover_data=[
-        "state",
-        "city",
-        "contract",
-        "cltv"
-    ],
-    zoom=3,
-    height=600
-)
+# Fragment: changing the map resolution reruns only this section.
+@fragment
+def map_section(rows, selections):
+    st.subheader("Customer Geographic Distribution")
+
+    map_level = st.selectbox(
+        "Map Resolution",
+        options=list(GEO_LEVELS),
+        index=list(GEO_LEVELS).index(DEFAULT_GEO_LEVEL)
+    )
+
+    map_bins = geo_index.bins(map_level, rows)
+    track_frame("map_bins", map_bins)
+
+    def build_map():
+        fig_map = px.scatter_mapbox(
+            map_bins,
+            lat="latitude",
+            lon="longitude",
+            color="churn_rate",
+            size="customers",
+            hover_name="area",
+            hover_data={
+                "customers": ":,",
+                "churn_rate": ":.1f",
+                "monthly_charges": ":,.0f",
+                "latitude": False,
+                "longitude": False
+            },
+            color_continuous_scale="RdYlGn_r",
+            zoom=3,
+            height=600
+        )
+
+        fig_map.update_layout(mapbox_style="carto-positron")
+        return fig_map
 
-fig_map.update_layout(mapbox_style="carto-positron")
+    map_state = {**selections, "map_level": map_level}
+    fig_map = cached_figure(PAGE_ID, "map", map_state, build_map)
 
-st.plotly_chart(fig_map, use_container_width=True)
+    plotly_chart(fig_map, use_container_width=True)
+
+    st.caption(
+        f"Customers aggregated into {len(map_bins):,} areas ({map_level}). "
+        "Bubble size shows customers, colour shows churn rate (%)."
+    )
+
+map_section(rows, selections)
 
 st.divider()
 
 # ======================================================
 # CLTV DISTRIBUTION BY STATE
 # ======================================================
-st.subheader("CLTV Distribution by State (Top 10 Revenue States)")
+# Below the fold: built only once the section is opened.
+@fragment
+def cltv_section(selections, top_states):
+    st.subheader("CLTV Distribution by State (Top 10 Revenue States)")
+
+    if not lazy_section("geographic_cltv", "Show CLTV distribution by state", FILTER_SECTION_CAPTION):
+        return
 
-top_states = revenue_state["state"].tolist()
+    def build_cltv():
+        cltv_state = box_summary(
+            "state", "cltv", {**selections, "state": top_states}, partitioned=partitioned
+        )
+        track_frame("cltv_state", cltv_state)
 
-cltv_state = filtered_df[filtered_df["state"].isin(top_states)]
+        return box_chart(cltv_state, x="state", y="cltv", order=top_states)
 
-fig_cltv = px.box(
-    cltv_state,
-    x="state",
-    y="cltv"
-)
+    fig_cltv = cached_figure(PAGE_ID, "cltv", selections, build_cltv)
 
-st.plotly_chart(fig_cltv, use_container_width=True)
+    plotly_chart(fig_cltv, use_container_width=True)
+
+cltv_section(selections, revenue_state["state"].tolist())
 
 st.divider()
 
@@ -185,3 +248,6 @@ st.markdown("""
 """)
 
 st.caption("Customer Churn Intelligence Dashboard – Geographic & Revenue Mapping")
+
+render_figure_cache_stats()
+render_performance_panel()
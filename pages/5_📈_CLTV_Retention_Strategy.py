@@ -1,18 +1,29 @@
 import streamlit as st
-import pandas as pd
 import plotly.express as px
-from pathlib import Path
-import numpy as np
+from utils.charts import figure_note, scatter_chart
+from utils.cube import mean, summarize
+from utils.features import load_enriched_data
+from utils.figure_cache import cached_figure, render_figure_cache_stats
+from utils.filter_index import filtered_rows, select_filtered
+from utils.filters import filter_multiselect
+from utils.memory import track_frame
+from utils.profiler import plotly_chart, render_performance_panel, start_rerun, timed
+from utils.refresh import use_current_dataset
 
 # ======================================================
 # PAGE CONFIGURATION
 # ======================================================
+PAGE_ID = "cltv_retention"
+
 st.set_page_config(
     page_title="CLTV & Retention Strategy",
     page_icon="📈",
     layout="wide"
 )
 
+start_rerun(PAGE_ID)
+use_current_dataset()
+
 st.title("📈 CLTV Strategy & Retention Targeting")
 st.markdown("### High-Value Customer Protection & Risk Segmentation")
 
@@ -25,76 +36,45 @@ Designed for revenue protection and customer lifecycle optimization.
 # ======================================================
 # LOAD DATA
 # ======================================================
-@st.cache_data
-def load_data():
-    base_path = Path(__file__).resolve().parent.parent
-    data_path = base_path / "data" / "final_dataset.csv"
-    df = pd.read_csv(data_path)
-    df.columns = df.columns.str.lower().str.strip()
-    return df
-
-df = load_data()
-
-# ======================================================
-# CREATE RISK SEGMENTATION
-# ======================================================
-
-# CLTV Tier
-df["cltv_tier"] = pd.qcut(
-    df["cltv"],
-    q=3,
-    labels=["Low Value", "Mid Value", "High Value"]
-)
-
-# Churn Risk Tier
-df["risk_tier"] = pd.qcut(
-    df["churn_score"],
-    q=3,
-    labels=["Low Risk", "Medium Risk", "High Risk"]
-)
-
-# Priority Segment
-df["retention_priority"] = np.where(
-    (df["cltv_tier"] == "High Value") & (df["risk_tier"] == "High Risk"),
-    "Critical Retention",
-    np.where(
-        (df["cltv_tier"] == "High Value"),
-        "High Value - Monitor",
-        "Standard"
-    )
-)
+# Shared dataset with the precomputed CLTV / risk tiers and retention
+# priority from utils.features.
+with timed("load"):
+    df = load_enriched_data()
 
 # ======================================================
 # SIDEBAR FILTERS
 # ======================================================
 st.sidebar.header("🔎 Retention Filters")
 
-priority_filter = st.sidebar.multiselect(
-    "Retention Priority",
-    options=df["retention_priority"].unique(),
-    default=df["retention_priority"].unique()
-)
+priority_filter = filter_multiselect(df, "retention_priority", "Retention Priority")
 
-contract_filter = st.sidebar.multiselect(
-    "Contract Type",
-    options=df["contract"].unique(),
-    default=df["contract"].unique()
-)
+contract_filter = filter_multiselect(df, "contract", "Contract Type")
+
+selections = {
+    "retention_priority": priority_filter,
+    "contract": contract_filter,
+}
 
-filtered_df = df[
-    (df["retention_priority"].isin(priority_filter)) &
-    (df["contract"].isin(contract_filter))
-]
+with timed("filter"):
+    rows = filtered_rows(selections)
+
+filter_state = selections
 
 # ======================================================
 # KPI SECTION
 # ======================================================
 st.subheader("📌 Retention Priority Metrics")
 
-total_customers = filtered_df["customer_id"].nunique()
-critical_customers = filtered_df[filtered_df["retention_priority"] == "Critical Retention"].shape[0]
-total_revenue = filtered_df["total_revenue"].sum()
-avg_cltv = filtered_df["cltv"].mean()
+kpis = summarize(rows, selections)
+
+total_customers = int(kpis["count"])
+critical_customers = int(
+    summarize(rows, selections, by="retention_priority")
+    .set_index("retention_priority")["count"]
+    .get("Critical Retention", 0)
+)
+total_revenue = kpis["total_revenue_sum"]
+avg_cltv = mean(kpis, "cltv")
 
 col1, col2, col3, col4 = st.columns(4)
 
@@ -110,21 +90,29 @@ st.divider()
 # ======================================================
 st.subheader("CLTV vs Churn Risk Matrix")
 
-fig_matrix = px.scatter(
-    filtered_df,
-    x="churn_score",
-    y="cltv",
-    color="retention_priority",
-    size="monthly_charges",
-    hover_data=[
-        "customer_id",
-        "contract",
-        "tenure_in_months",
-        "churn_label"
-    ]
-)
+def build_matrix():
+    return scatter_chart(
+        select_filtered(df, selections),
+        x="churn_score",
+        y="cltv",
+        color="retention_priority",
+        size="monthly_charges",
+        hover_data=[
+            "customer_id",
+            "contract",
+            "tenure_in_months",
+            "churn_label"
+        ]
+    )
+
+fig_matrix = cached_figure(PAGE_ID, "matrix", filter_state, build_matrix)
+
+plotly_chart(fig_matrix, use_container_width=True)
 
-st.plotly_chart(fig_matrix, use_container_width=True)
+matrix_note = figure_note(fig_matrix)
+
+if matrix_note:
+    st.caption(matrix_note)
 
 st.divider()
 
@@ -136,37 +124,38 @@ col1, col2 = st.columns(2)
 with col1:
     st.subheader("Retention Priority Distribution")
 
-    priority_dist = (
-        filtered_df.groupby("retention_priority")
-        .size()
-        .reset_index(name="count")
-    )
+    def build_priority():
+        priority_dist = summarize(rows, selections, by="retention_priority")
 
-    fig_priority = px.pie(
-        priority_dist,
-        names="retention_priority",
-        values="count",
-        hole=0.5
-    )
+        return px.pie(
+            priority_dist,
+            names="retention_priority",
+            values="count",
+            hole=0.5
+        )
+
+    fig_priority = cached_figure(PAGE_ID, "priority", filter_state, build_priority)
 
-    st.plotly_chart(fig_priority, use_container_width=True)
+    plotly_chart(fig_priority, use_container_width=True)
 
 with col2:
     st.subheader("Revenue by Retention Segment")
 
-    revenue_priority = (
-        filtered_df.groupby("retention_priority")["total_revenue"]
-        .sum()
-        .reset_index()
-    )
+    def build_revenue():
+        revenue_priority = (
+            summarize(rows, selections, by="retention_priority")
+            .rename(columns={"total_revenue_sum": "total_revenue"})
+        )
 
-    fig_revenue = px.bar(
-        revenue_priority,
-        x="retention_priority",
-        y="total_revenue"
-    )
+        return px.bar(
+            revenue_priority,
+            x="retention_priority",
+            y="total_revenue"
+        )
 
-    st.plotly_chart(fig_revenue, use_container_width=True)
+    fig_revenue = cached_figure(PAGE_ID, "revenue", filter_state, build_revenue)
+
+    plotly_chart(fig_revenue, use_container_width=True)
 
 st.divider()
 
@@ -175,21 +164,21 @@ st.divider()
 # ======================================================
 st.subheader("Contract Distribution by Retention Priority")
 
-contract_priority = (
-    filtered_df.groupby(["contract", "retention_priority"])
-    .size()
-    .reset_index(name="count")
-)
+def build_contract():
+    contract_priority = summarize(rows, selections, by=["contract", "retention_priority"])
+    track_frame("contract_priority", contract_priority)
 
-fig_contract = px.bar(
-    contract_priority,
-    x="contract",
-    y="count",
-    color="retention_priority",
-    barmode="group"
-)
+    return px.bar(
+        contract_priority,
+        x="contract",
+        y="count",
+        color="retention_priority",
+        barmode="group"
+    )
 
-st.plotly_chart(fig_contract, use_container_width=True)
+fig_contract = cached_figure(PAGE_ID, "contract", filter_state, build_contract)
+
+plotly_chart(fig_contract, use_container_width=True)
 
 st.divider()
 
@@ -218,3 +207,6 @@ st.markdown("""
 """)
 
 st.caption("Customer Churn Intelligence Dashboard – CLTV & Strategic Retention Modeling")
+
+render_figure_cache_stats()
+render_performance_panel()
@@ -1,5 +1,6 @@
 import streamlit as st
-from pathlib import Path
+from utils.images import image_for
+from utils.sections import lazy_section
 
 # ======================================================
 # PAGE CONFIGURATION
@@ -24,17 +25,20 @@ st.divider()
 # ======================================================
 # LOAD IMAGES
 # ======================================================
-base_path = Path(__file__).resolve().parent.parent
-image_path = base_path / "images"
-
+# WebP variants sized for the page width, encoded once per process.
 st.subheader("Executive Overview Dashboard")
-st.image(str(image_path / "Dashboard_1.png"), use_container_width=True)
+st.image(image_for("Dashboard_1.png"), use_container_width=True)
+
+# Below the fold: each screenshot is sent only once its section is opened.
+@st.fragment
+def dashboard_section(title, name):
+    st.subheader(title)
 
-st.subheader("Churn Risk & Service Analysis")
-st.image(str(image_path / "Dashboard_2.png"), use_container_width=True)
+    if lazy_section(name, "Show dashboard"):
+        st.image(image_for(name), use_container_width=True)
 
-st.subheader("Revenue & Geographic Intelligence")
-st.image(str(image_path / "Dashboard_3.png"), use_container_width=True)
+dashboard_section("Churn Risk & Service Analysis", "Dashboard_2.png")
+dashboard_section("Revenue & Geographic Intelligence", "Dashboard_3.png")
 
 st.divider()
 
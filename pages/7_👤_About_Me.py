@@ -1,5 +1,5 @@
 import streamlit as st
-import os
+from utils.images import image_for
 
 # ======================
 # PAGE CONFIG
@@ -19,10 +19,9 @@ st.divider()
 col1, col2 = st.columns([1, 3])
 
 with col1:
-    image_path = os.path.join("images", "FOTO_INTAN.png")
     st.image(
-        image_path,
-        width=280  
+        image_for("FOTO_INTAN.png", 280),
+        width=280
     )
 
 with col2:
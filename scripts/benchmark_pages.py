@@ -0,0 +1,289 @@
+"""Benchmark each analytical page headlessly across dataset sizes.
+
+Every page script is driven with Streamlit's AppTest in a fresh Python
+process per (dataset size, page), so the first run is a true cold start:
+dataset load, derived features, indexes and figures are all built from
+scratch. A scripted set of filter interactions then runs against the warm
+process caches:
+
+- default         rerun with the default filters
+- single_contract Contract Type narrowed to one value
+- narrow_tenure   Tenure (Months) narrowed to 12-24
+- single_state    State narrowed to one value
+
+Interactions whose widget a page does not have are skipped. For each run
+the suite records wall time (first run and median of the warm repeats),
+the bytes of Plotly chart payload sent to the browser and the peak RSS of
+the process. Datasets larger than the shipped extract are synthesised
+once with scripts/generate_dataset.py.
+
+Results are written as JSON and compared against a saved baseline; the
+script exits with status 1 when a metric regresses beyond --tolerance.
+
+Usage:
+    python scripts/benchmark_pages.py [--sizes 7043,100000] [--pages 1,3]
+        [--repeats 5] [--tolerance 0.25] [--save-baseline]
+"""
+import argparse
+import json
+import logging
+import os
+import platform
+import resource
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+BASE_PATH = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BASE_PATH))
+os.chdir(BASE_PATH)
+
+from generate_dataset import SOURCE_PATH, SYNTHETIC_PATH, write_dataset  # noqa: E402
+
+PAGES = sorted((BASE_PATH / "pages").glob("[1-5]_*.py"))
+RESULTS_PATH = BASE_PATH / "benchmarks" / "latest.json"
+BASELINE_PATH = BASE_PATH / "benchmarks" / "baseline.json"
+
+DEFAULT_SIZES = [7043, 100_000]
+TENURE_WINDOW = (12, 24)
+
+# Timing differences below this are treated as noise when comparing.
+MIN_TIME_DELTA = 0.010
+
+# Lower is better for every recorded metric.
+METRICS = ["first_s", "warm_s", "payload_bytes", "peak_rss_mb"]
+
+
+# ======================================================
+# SCRIPTED INTERACTIONS
+# ======================================================
+def find_widget(widgets, label):
+    return next((widget for widget in widgets if widget.label == label), None)
+
+
+def narrow_multiselect(label):
+    def apply(app):
+        widget = find_widget(app.multiselect, label)
+        if widget is None:
+            return False
+        widget.set_value(widget.options[:1])
+        return True
+    return apply
+
+
+def narrow_tenure(app):
+    widget = find_widget(app.slider, "Tenure (Months)")
+    if widget is None:
+        return False
+    widget.set_value(TENURE_WINDOW)
+    return True
+
+
+SCENARIOS = {
+    "default": lambda app: True,
+    "single_contract": narrow_multiselect("Contract Type"),
+    "narrow_tenure": narrow_tenure,
+    "single_state": narrow_multiselect("State"),
+}
+
+
+# ======================================================
+# WORKER (one page, one dataset, fresh process)
+# ======================================================
+def peak_rss_mb():
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in kilobytes on Linux and bytes on macOS
+    return peak / 2**20 if sys.platform == "darwin" else peak / 2**10
+
+
+def chart_payload_bytes(app):
+    return sum(len(chart.proto.spec.encode()) for chart in app.get("plotly_chart"))
+
+
+def timed_run(app):
+    started = time.perf_counter()
+    app.run()
+    elapsed = time.perf_counter() - started
+    if app.exception:
+        raise RuntimeError(app.exception[0].value)
+    return elapsed
+
+
+def run_worker(page, repeats):
+    from streamlit.testing.v1 import AppTest
+
+    logging.disable(logging.WARNING)
+
+    def new_app():
+        return AppTest.from_file(str(page), default_timeout=600)
+
+    app = new_app()
+    cold = timed_run(app)
+    records = [{
+        "scenario": "cold",
+        "first_s": cold,
+        "payload_bytes": chart_payload_bytes(app),
+        "peak_rss_mb": peak_rss_mb(),
+    }]
+
+    for name, apply in SCENARIOS.items():
+        # Each interaction starts from a new session with default filters
+        app = new_app()
+        timed_run(app)
+        if not apply(app):
+            continue
+        first = timed_run(app)
+        warm = [timed_run(app) for _ in range(repeats)]
+        records.append({
+            "scenario": name,
+            "first_s": first,
+            "warm_s": statistics.median(warm),
+            "payload_bytes": chart_payload_bytes(app),
+            "peak_rss_mb": peak_rss_mb(),
+        })
+
+    print(json.dumps(records))
+
+
+# ======================================================
+# DRIVER
+# ======================================================
+def source_rows():
+    with open(SOURCE_PATH, encoding="utf-8") as handle:
+        return sum(1 for _ in handle) - 1
+
+
+def dataset_for(size):
+    """CSV path with ``size`` customers, generating it on first use."""
+    if size == source_rows():
+        return SOURCE_PATH
+
+    path = SYNTHETIC_PATH / f"final_dataset_{size}.csv"
+    if not path.exists():
+        print(f"Generating {path.relative_to(BASE_PATH)} ...", flush=True)
+        write_dataset(path, size)
+    return path
+
+
+def benchmark_page(page, dataset, repeats):
+    env = dict(os.environ, CHURN_DATA_PATH=str(dataset))
+    completed = subprocess.run(
+        [sys.executable, __file__, "--worker", str(page), "--repeats", str(repeats)],
+        env=env,
+        capture_output=True,
+        text=True
+    )
+    if completed.returncode != 0:
+        raise RuntimeError(f"{page.name} failed:\n{completed.stderr}")
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def run_suite(sizes, pages, repeats):
+    results = []
+    for size in sizes:
+        dataset = dataset_for(size)
+        for page in pages:
+            for record in benchmark_page(page, dataset, repeats):
+                results.append({"size": size, "page": page.stem, **record})
+                print_record(results[-1])
+    return results
+
+
+def print_record(record):
+    warm = f"{record['warm_s'] * 1000:>8.1f}" if "warm_s" in record else f"{'-':>8}"
+    print(
+        f"{record['size']:>10,} {record['page']:<38} {record['scenario']:<16}"
+        f" first {record['first_s'] * 1000:>8.1f} ms"
+        f" warm {warm} ms"
+        f" payload {record['payload_bytes'] / 2**10:>8.1f} KB"
+        f" rss {record['peak_rss_mb']:>7.1f} MB",
+        flush=True
+    )
+
+
+# ======================================================
+# BASELINE COMPARISON
+# ======================================================
+def record_key(record):
+    return record["size"], record["page"], record["scenario"]
+
+
+def compare(results, baseline, tolerance):
+    """Return (key, metric, before, after) for metrics that regressed."""
+    before_by_key = {record_key(record): record for record in baseline}
+    regressions = []
+    for record in results:
+        before = before_by_key.get(record_key(record))
+        if before is None:
+            continue
+        for metric in METRICS:
+            old, new = before.get(metric), record.get(metric)
+            if old is None or new is None:
+                continue
+            if metric.endswith("_s") and new - old < MIN_TIME_DELTA:
+                continue
+            if new > old * (1 + tolerance):
+                regressions.append((record_key(record), metric, old, new))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", default=",".join(map(str, DEFAULT_SIZES)))
+    parser.add_argument("--pages", help="comma-separated page numbers, default all")
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--tolerance", type=float, default=0.25)
+    parser.add_argument("--output", type=Path, default=RESULTS_PATH)
+    parser.add_argument("--baseline", type=Path, default=BASELINE_PATH)
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--worker", type=Path, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        run_worker(args.worker, args.repeats)
+        return
+
+    sizes = [int(size) for size in args.sizes.split(",")]
+    pages = PAGES
+    if args.pages:
+        wanted = set(args.pages.split(","))
+        pages = [page for page in PAGES if page.name.split("_")[0] in wanted]
+
+    results = run_suite(sizes, pages, args.repeats)
+
+    report = {
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "repeats": args.repeats,
+        "results": results,
+    }
+    args.output.parent.mkdir(parents=True, exist_ok=True)
+    args.output.write_text(json.dumps(report, indent=2, ensure_ascii=False), encoding="utf-8")
+    print(f"\nWrote {args.output}")
+
+    if args.save_baseline:
+        args.baseline.write_text(args.output.read_text(encoding="utf-8"), encoding="utf-8")
+        print(f"Saved baseline {args.baseline}")
+        return
+
+    if not args.baseline.exists():
+        print("No baseline to compare against; rerun with --save-baseline to record one.")
+        return
+
+    baseline = json.loads(args.baseline.read_text(encoding="utf-8"))["results"]
+    regressions = compare(results, baseline, args.tolerance)
+    if not regressions:
+        print(f"No regressions beyond {args.tolerance:.0%} against {args.baseline}")
+        return
+
+    print(f"\n{len(regressions)} regression(s) beyond {args.tolerance:.0%}:")
+    for (size, page, scenario), metric, old, new in regressions:
+        print(f"  {size:>10,} {page:<38} {scenario:<16} {metric:<14} {old:>12.3f} -> {new:>12.3f}")
+    sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
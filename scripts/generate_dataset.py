@@ -0,0 +1,220 @@
+"""Synthesise a larger final_dataset.csv for capacity planning.
+
+A model is fitted on the shipped 7,043-row extract and used to write any
+number of customers with the same 54-column schema:
+
+- contract x internet_service x churn_label segments keep their joint
+  frequencies; each synthetic customer copies a template customer from
+  its segment, so service flags, offers, payment methods and churn
+  reasons stay mutually consistent.
+- Locations are drawn state -> city -> zip code with the extract's
+  frequencies and jittered around the zip centroid.
+- Tenure, age and charges are perturbed around the template. Totals are
+  rescaled to the new tenure and charges, and total_revenue is
+  recomputed from its components.
+- CLTV follows the fitted CLTV-on-tenure slope, and churn_score stays
+  inside the range observed for the customer's churn_value.
+
+Rows are generated and appended to the CSV chunk by chunk, so memory
+stays proportional to --chunk-size rather than --rows. Output is
+deterministic for a given --seed and --chunk-size.
+
+Usage:
+    python scripts/generate_dataset.py --rows 1000000 [--seed 42]
+        [--chunk-size 100000] [--output data/synthetic/final_dataset_1000000.csv]
+"""
+import argparse
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+BASE_PATH = Path(__file__).resolve().parent.parent
+SOURCE_PATH = BASE_PATH / "data" / "final_dataset.csv"
+SYNTHETIC_PATH = BASE_PATH / "data" / "synthetic"
+
+SEGMENT_COLUMNS = ["contract", "internet_service", "churn_label"]
+LOCATION_COLUMNS = ["country", "state", "city", "zip_code", "total_population", "latitude", "longitude"]
+
+AGE_JITTER = 2
+TENURE_SIGMA = 0.10
+CHARGE_SIGMA = 0.05
+CLTV_SIGMA = 150
+CHURN_SCORE_JITTER = 3
+COORDINATE_SIGMA = 0.005
+
+
+# ======================================================
+# MODEL
+# ======================================================
+def fit_model(source):
+    """Learn the distributions the generator samples from."""
+    source = source.reset_index(drop=True)
+
+    segments = source.groupby(SEGMENT_COLUMNS, observed=True).indices
+    segment_keys = list(segments)
+    segment_weights = np.array([len(segments[key]) for key in segment_keys], dtype="float64")
+
+    locations = (
+        source.groupby(LOCATION_COLUMNS[:4], observed=True)
+        .agg(
+            total_population=("total_population", "first"),
+            latitude=("latitude", "mean"),
+            longitude=("longitude", "mean"),
+            weight=("customer_id", "size")
+        )
+        .reset_index()
+    )
+
+    cltv_slope = np.polyfit(source["tenure"], source["cltv"], 1)[0]
+    churn_score_range = source.groupby("churn_value")["churn_score"].agg(["min", "max"])
+
+    return {
+        "source": source,
+        "segment_rows": [segments[key] for key in segment_keys],
+        "segment_p": segment_weights / segment_weights.sum(),
+        "locations": locations[LOCATION_COLUMNS],
+        "location_p": (locations["weight"] / locations["weight"].sum()).to_numpy(),
+        "cltv_slope": cltv_slope,
+        "cltv_range": (source["cltv"].min(), source["cltv"].max()),
+        "churn_score_range": churn_score_range,
+        "age_range": (source["age"].min(), source["age"].max()),
+        "tenure_max": source["tenure"].max(),
+    }
+
+
+def yes_no(mask):
+    return np.where(mask, "Yes", "No")
+
+
+def age_group(age):
+    return np.select([age < 30, age < 60], ["<30", "30–59"], "60+")
+
+
+# ======================================================
+# SAMPLING
+# ======================================================
+def sample_chunk(model, start, size, rng):
+    """Synthesise customers start .. start + size - 1."""
+    source = model["source"]
+
+    segment = rng.choice(len(model["segment_rows"]), size=size, p=model["segment_p"])
+    template = np.empty(size, dtype="int64")
+    for code, rows in enumerate(model["segment_rows"]):
+        picked = segment == code
+        template[picked] = rng.choice(rows, size=picked.sum())
+
+    chunk = source.iloc[template].reset_index(drop=True)
+    chunk["customer_id"] = [f"SYN-{i:08d}" for i in range(start, start + size)]
+
+    # Location: state -> city -> zip, jittered around the zip centroid
+    location = model["locations"].iloc[
+        rng.choice(len(model["locations"]), size=size, p=model["location_p"])
+    ].reset_index(drop=True)
+    location["latitude"] += rng.normal(0, COORDINATE_SIGMA, size)
+    location["longitude"] += rng.normal(0, COORDINATE_SIGMA, size)
+    chunk[LOCATION_COLUMNS] = location[LOCATION_COLUMNS]
+    chunk["latitude"] = chunk["latitude"].round(6)
+    chunk["longitude"] = chunk["longitude"].round(6)
+
+    # Demographics
+    low, high = model["age_range"]
+    age = np.clip(chunk["age"].to_numpy() + rng.integers(-AGE_JITTER, AGE_JITTER + 1, size), low, high)
+    chunk["age"] = age
+    chunk["under_30"] = yes_no(age < 30)
+    chunk["senior_citizen"] = yes_no(age >= 65)
+    chunk["age_group"] = age_group(age)
+
+    # Tenure: multiplicative jitter keeps new customers new
+    old_tenure = chunk["tenure"].to_numpy()
+    tenure = np.clip(
+        np.rint(old_tenure * np.exp(rng.normal(0, TENURE_SIGMA, size))), 0, model["tenure_max"]
+    ).astype("int64")
+    chunk["tenure"] = tenure
+    chunk["tenure_in_months"] = np.where(
+        chunk["tenure_in_months"].to_numpy() == old_tenure, tenure, chunk["tenure_in_months"]
+    )
+
+    # Charges: totals follow the new tenure and monthly charge
+    old_monthly = chunk["monthly_charges"].to_numpy()
+    monthly = np.round(old_monthly * np.exp(rng.normal(0, CHARGE_SIGMA, size)), 2)
+    chunk["monthly_charges"] = monthly
+
+    charge_scale = np.divide(
+        monthly * tenure, old_monthly * old_tenure,
+        out=np.ones(size), where=old_tenure > 0
+    )
+    tenure_scale = np.divide(
+        tenure, old_tenure,
+        out=np.ones(size), where=old_tenure > 0
+    )
+    chunk["total_charges"] = np.round(chunk["total_charges"] * charge_scale, 2)
+    chunk["total_long_distance_charges"] = np.round(chunk["total_long_distance_charges"] * tenure_scale, 2)
+    chunk["total_refunds"] = np.minimum(chunk["total_refunds"], chunk["total_charges"])
+    chunk["total_revenue"] = np.round(
+        chunk["total_charges"]
+        - chunk["total_refunds"]
+        + chunk["total_extra_data_charges"]
+        + chunk["total_long_distance_charges"],
+        2
+    )
+
+    # CLTV keeps the fitted tenure slope
+    low, high = model["cltv_range"]
+    cltv = (
+        chunk["cltv"].to_numpy()
+        + model["cltv_slope"] * (tenure - old_tenure)
+        + rng.normal(0, CLTV_SIGMA, size)
+    )
+    chunk["cltv"] = np.clip(np.rint(cltv), low, high).astype("int64")
+
+    # Churn score stays within its churn_value band
+    score_range = model["churn_score_range"].reindex(chunk["churn_value"])
+    score = chunk["churn_score"].to_numpy() + rng.integers(-CHURN_SCORE_JITTER, CHURN_SCORE_JITTER + 1, size)
+    chunk["churn_score"] = np.clip(score, score_range["min"].to_numpy(), score_range["max"].to_numpy())
+
+    return chunk[source.columns]
+
+
+def generate(model, rows, seed, chunk_size):
+    """Yield synthetic chunks; each chunk has its own seeded generator."""
+    for number, start in enumerate(range(0, rows, chunk_size)):
+        rng = np.random.default_rng([seed, number])
+        yield sample_chunk(model, start, min(chunk_size, rows - start), rng)
+
+
+def write_dataset(output, rows, seed=42, chunk_size=100_000, source_path=SOURCE_PATH):
+    model = fit_model(pd.read_csv(source_path))
+
+    output = Path(output)
+    output.parent.mkdir(parents=True, exist_ok=True)
+    partial = output.with_name(output.name + ".partial")
+    with open(partial, "w", newline="", encoding="utf-8") as handle:
+        for number, chunk in enumerate(generate(model, rows, seed, chunk_size)):
+            chunk.to_csv(handle, header=number == 0, index=False)
+    partial.replace(output)
+    return output
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, required=True)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--chunk-size", type=int, default=100_000)
+    parser.add_argument("--output", type=Path)
+    args = parser.parse_args()
+
+    output = args.output or SYNTHETIC_PATH / f"final_dataset_{args.rows}.csv"
+    started = time.perf_counter()
+    write_dataset(output, args.rows, args.seed, args.chunk_size)
+
+    size = output.stat().st_size
+    print(
+        f"Wrote {output}: {args.rows:,} rows, {size / 2**20:,.1f} MB "
+        f"in {time.perf_counter() - started:,.1f} s"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+"""Print per-column memory of final_dataset.csv before and after the dtype plan.
+
+Usage:
+    python scripts/memory_report.py [path/to/final_dataset.csv]
+"""
+import sys
+from pathlib import Path
+
+import pandas as pd
+
+BASE_PATH = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BASE_PATH))
+
+from utils.schema import read_csv  # noqa: E402
+
+DEFAULT_PATH = BASE_PATH / "data" / "final_dataset.csv"
+
+
+def memory_report(path):
+    raw = pd.read_csv(path)
+    raw.columns = raw.columns.str.lower().str.strip()
+    typed = read_csv(path)
+
+    before = raw.memory_usage(deep=True, index=False)
+    after = typed.memory_usage(deep=True, index=False)
+
+    report = pd.DataFrame({
+        "dtype_before": raw.dtypes.astype(str),
+        "dtype_after": typed.dtypes.astype(str),
+        "bytes_before": before,
+        "bytes_after": after,
+    })
+    report["ratio"] = (report["bytes_before"] / report["bytes_after"]).round(1)
+    return report.sort_values(by="bytes_before", ascending=False)
+
+
+def main():
+    path = Path(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_PATH
+    report = memory_report(path)
+
+    with pd.option_context("display.max_rows", None, "display.width", 120):
+        print(report.to_string())
+
+    total_before = report["bytes_before"].sum()
+    total_after = report["bytes_after"].sum()
+    print()
+    print(f"Total before: {total_before / 1e6:,.2f} MB")
+    print(f"Total after:  {total_after / 1e6:,.2f} MB")
+    print(f"Reduction:    {total_before / total_after:,.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""Convert final_dataset.csv into a memory-mappable Arrow IPC file.
+
+Run once per CSV refresh, before starting the Streamlit workers. Each
+worker then memory-maps data/final_dataset.arrow at startup instead of
+parsing the CSV, and all workers on the host share one physical copy of
+the column data through the OS page cache.
+
+With --parquet, also write data/final_dataset.parquet/: a Parquet store
+partitioned by state (and optionally contract) with per-row-group
+statistics, rows sorted by tenure within each partition. With
+CHURN_PARTITIONED_READS=1, pages 1 and 4 read only the partitions, row
+groups and columns their current filter needs from it.
+
+Usage:
+    python scripts/prepare_dataset.py [--parquet] [--partition-by state,contract]
+        [--row-group-size 65536]
+"""
+import argparse
+import sys
+from pathlib import Path
+
+BASE_PATH = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BASE_PATH))
+
+from utils.arrow_store import write_arrow  # noqa: E402
+from utils.data_loader import ARROW_PATH, DATA_PATH, PARQUET_PATH, content_version  # noqa: E402
+from utils.parquet_store import PARTITION_COLUMNS, ROW_GROUP_SIZE, write_partitioned  # noqa: E402
+from utils.schema import read_csv  # noqa: E402
+
+
+def display_path(path):
+    return path.relative_to(BASE_PATH) if path.is_relative_to(BASE_PATH) else path
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--parquet", action="store_true", help="also write the partitioned Parquet store")
+    parser.add_argument("--partition-by", default=",".join(PARTITION_COLUMNS),
+                        help="comma-separated partition columns, outermost first")
+    parser.add_argument("--row-group-size", type=int, default=ROW_GROUP_SIZE)
+    args = parser.parse_args()
+
+    df = read_csv(DATA_PATH)
+    version = content_version(DATA_PATH)
+    write_arrow(df, ARROW_PATH, version)
+
+    size = ARROW_PATH.stat().st_size
+    print(f"Wrote {display_path(ARROW_PATH)}: {len(df):,} rows, {size / 2**20:,.1f} MB")
+
+    if not args.parquet:
+        return
+
+    partition_by = args.partition_by.split(",")
+    write_partitioned(df, PARQUET_PATH, version, partition_by, args.row_group_size)
+
+    files = list(PARQUET_PATH.rglob("*.parquet"))
+    size = sum(path.stat().st_size for path in files)
+    print(
+        f"Wrote {display_path(PARQUET_PATH)}: {len(files):,} partitions by "
+        f"{', '.join(partition_by)}, {size / 2**20:,.1f} MB"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,34 @@
+"""Pre-encode the WebP variants served for the images in images/.
+
+Run after adding or replacing an image. Each server process then reads
+images/variants/*.webp instead of resizing and encoding the PNGs on its
+first page view.
+
+Usage:
+    python scripts/prepare_images.py
+"""
+import sys
+from pathlib import Path
+
+BASE_PATH = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BASE_PATH))
+
+from utils.images import IMAGE_PATH, VARIANT_PATH, build_variants, variant_path  # noqa: E402
+
+
+def main():
+    VARIANT_PATH.mkdir(exist_ok=True)
+    for source in sorted(IMAGE_PATH.glob("*.png")):
+        for stale in VARIANT_PATH.glob(f"{source.stem}-*.webp"):
+            stale.unlink()
+
+        variants = build_variants(source.name)
+        for width, payload in variants.items():
+            variant_path(source.name, width).write_bytes(payload)
+
+        sizes = ", ".join(f"{w}px {len(b) / 2**10:,.0f} KB" for w, b in variants.items())
+        print(f"{source.name} ({source.stat().st_size / 2**10:,.0f} KB): {sizes}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,181 @@
+"""Profile cold-start import and first-render time of every app script.
+
+Each script (app.py and every page) is run once with Streamlit's AppTest
+in a fresh Python process started with ``-X importtime``. Streamlit and
+the test harness are imported and warmed up first, so what remains is
+what a server process pays the first time a visitor opens that page:
+
+- import_s  time spent importing modules the script pulled in
+- render_s  the rest of the first run (data loading, figures, widgets)
+
+The heaviest packages imported per script are listed by their own import
+time. Landing, showcase and About Me pages must not load the data stack
+(pandas, plotly.express, pyarrow, ...); --check exits with status 1 when
+one does. numpy is not part of the check: st.image imports it itself.
+
+Usage:
+    python scripts/profile_startup.py [--pages app,6,7] [--top 5] [--check]
+"""
+import argparse
+import json
+import logging
+import os
+import platform
+import subprocess
+import sys
+import time
+from collections import Counter
+from pathlib import Path
+
+BASE_PATH = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BASE_PATH))
+os.chdir(BASE_PATH)
+
+SCRIPTS = [BASE_PATH / "app.py"] + sorted((BASE_PATH / "pages").glob("*.py"))
+RESULTS_PATH = BASE_PATH / "benchmarks" / "startup.json"
+
+# Scripts that render no data and should start without the data stack.
+LIGHT_SCRIPTS = ["app", "6", "7"]
+DATA_STACK = ["pandas", "plotly.express", "pyarrow", "polars", "duckdb"]
+
+# Written to stderr between the harness imports and the script's own.
+MARKER = "startup-profile: script start"
+
+
+def script_id(script):
+    return "app" if script.name == "app.py" else script.name.split("_")[0]
+
+
+# ======================================================
+# WORKER (one script, fresh process)
+# ======================================================
+def run_worker(script):
+    from streamlit.testing.v1 import AppTest
+
+    logging.disable(logging.WARNING)
+
+    # Load the script runner's own lazy imports before measuring.
+    AppTest.from_string("import streamlit as st\nst.write('')").run()
+
+    before = set(sys.modules)
+    print(MARKER, file=sys.stderr, flush=True)
+
+    app = AppTest.from_file(str(script), default_timeout=600)
+    started = time.perf_counter()
+    app.run()
+    elapsed = time.perf_counter() - started
+    if app.exception:
+        raise RuntimeError(app.exception[0].value)
+
+    loaded = set(sys.modules) - before
+    print(json.dumps({
+        "first_s": elapsed,
+        "data_stack": [name for name in DATA_STACK if name in loaded],
+    }))
+
+
+# ======================================================
+# DRIVER
+# ======================================================
+def parse_importtime(stderr):
+    """Own import time per top-level package, in seconds, after MARKER."""
+    lines = stderr.splitlines()
+    if MARKER in lines:
+        lines = lines[lines.index(MARKER) + 1:]
+
+    packages = Counter()
+    for line in lines:
+        if not line.startswith("import time:"):
+            continue
+        own, _, name = line[len("import time:"):].split("|")
+        if not own.strip().isdigit():
+            continue
+        packages[name.strip().split(".")[0]] += int(own) / 1e6
+    return packages
+
+
+def profile_script(script):
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", __file__, "--worker", str(script)],
+        capture_output=True,
+        text=True
+    )
+    if completed.returncode != 0:
+        raise RuntimeError(f"{script.name} failed:\n{completed.stderr}")
+
+    result = json.loads(completed.stdout.strip().splitlines()[-1])
+    packages = parse_importtime(completed.stderr)
+    import_s = sum(packages.values())
+    return {
+        "script": script.stem,
+        "import_s": import_s,
+        "render_s": max(result["first_s"] - import_s, 0.0),
+        "first_s": result["first_s"],
+        "data_stack": result["data_stack"],
+        "packages_s": dict(packages.most_common()),
+    }
+
+
+def print_record(record, top):
+    heaviest = ", ".join(
+        f"{name} {seconds * 1000:.0f}"
+        for name, seconds in list(record["packages_s"].items())[:top]
+    )
+    print(
+        f"{record['script']:<38}"
+        f" import {record['import_s'] * 1000:>7.1f} ms"
+        f" render {record['render_s'] * 1000:>7.1f} ms"
+        f" first {record['first_s'] * 1000:>7.1f} ms"
+        f"  [{heaviest}]",
+        flush=True
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--pages", help="comma-separated page numbers and/or 'app', default all")
+    parser.add_argument("--top", type=int, default=5, help="heaviest packages listed per script")
+    parser.add_argument("--output", type=Path, default=RESULTS_PATH)
+    parser.add_argument("--check", action="store_true")
+    parser.add_argument("--worker", type=Path, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        run_worker(args.worker)
+        return
+
+    scripts = SCRIPTS
+    if args.pages:
+        wanted = set(args.pages.split(","))
+        scripts = [script for script in SCRIPTS if script_id(script) in wanted]
+
+    results = []
+    for script in scripts:
+        results.append({"id": script_id(script), **profile_script(script)})
+        print_record(results[-1], args.top)
+
+    report = {
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "results": results,
+    }
+    args.output.parent.mkdir(parents=True, exist_ok=True)
+    args.output.write_text(json.dumps(report, indent=2, ensure_ascii=False), encoding="utf-8")
+    print(f"\nWrote {args.output}")
+
+    if not args.check:
+        return
+
+    offenders = [r for r in results if r["id"] in LIGHT_SCRIPTS and r["data_stack"]]
+    if not offenders:
+        print("Light pages start without the data stack")
+        return
+
+    for record in offenders:
+        print(f"  {record['script']} loads {', '.join(record['data_stack'])}")
+    sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+"""Measure memory allocated per warm rerun of each analytical page.
+
+Each page script is driven headlessly with Streamlit's AppTest: one cold
+run to fill the caches, then several warm reruns traced with tracemalloc.
+The peak traced allocation of a rerun approximates the transient memory a
+single widget interaction costs on the server.
+
+Usage:
+    python scripts/rerun_allocation.py [reruns]
+"""
+import logging
+import os
+import sys
+import tracemalloc
+from pathlib import Path
+
+BASE_PATH = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BASE_PATH))
+os.chdir(BASE_PATH)
+
+from streamlit.testing.v1 import AppTest  # noqa: E402
+
+PAGES = sorted((BASE_PATH / "pages").glob("[1-5]_*.py"))
+
+
+def measure_page(page, reruns):
+    app = AppTest.from_file(str(page), default_timeout=300)
+    app.run()
+
+    peaks = []
+    tracemalloc.start()
+    for _ in range(reruns):
+        tracemalloc.reset_peak()
+        start, _ = tracemalloc.get_traced_memory()
+        app.run()
+        _, peak = tracemalloc.get_traced_memory()
+        peaks.append(peak - start)
+    tracemalloc.stop()
+
+    if app.exception:
+        raise RuntimeError(f"{page.name} raised: {app.exception[0].value}")
+    return sum(peaks) / len(peaks)
+
+
+def main():
+    logging.disable(logging.WARNING)
+    reruns = int(sys.argv[1]) if len(sys.argv) > 1 else 3
+
+    total = 0
+    print(f"{'page':<45} {'peak alloc / rerun':>20}")
+    for page in PAGES:
+        peak = measure_page(page, reruns)
+        total += peak
+        print(f"{page.stem:<45} {peak / 2**20:>17.2f} MB")
+    print(f"{'total':<45} {total / 2**20:>17.2f} MB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,33 @@
+"""Start the dashboard server with its caches warming up in the background.
+
+The warm-up (utils.warmup) loads the dataset, builds the filter indexes,
+derived tiers and aggregate cube, and renders pages 1-5 for the default
+filters, all in a thread of the server process, so the first analyst after
+a deploy finds every shared cache filled. The server accepts connections
+and answers health checks immediately; set CHURN_WARMUP_STATUS to a file
+path to expose the progress to a readiness probe.
+
+Arguments are passed to `streamlit run app.py` unchanged.
+
+Usage:
+    python scripts/serve.py [--server.port 8501] [...]
+"""
+import sys
+from pathlib import Path
+
+BASE_PATH = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BASE_PATH))
+
+from streamlit.web import cli  # noqa: E402
+
+from utils.warmup import start_warmup  # noqa: E402
+
+
+def main():
+    start_warmup(wait_for_server=True)
+    sys.argv = ["streamlit", "run", str(BASE_PATH / "app.py"), *sys.argv[1:]]
+    cli.main()
+
+
+if __name__ == "__main__":
+    main()
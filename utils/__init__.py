@@ -0,0 +1 @@
+# Shared data-access and analytics helpers for the dashboard pages.
@@ -0,0 +1,44 @@
+import pyarrow as pa
+import pyarrow.feather as feather
+
+from utils.schema import apply_schema
+
+# ======================================================
+# ARROW IPC STORE
+# ======================================================
+# Schema metadata key recording which CSV revision the file was built from.
+SOURCE_VERSION_KEY = b"source_version"
+
+
+def write_arrow(df, path, source_version):
+    """Write ``df`` as an uncompressed Arrow IPC (Feather v2) file.
+
+    The file is left uncompressed so readers can memory-map it and share
+    one copy of the column buffers through the OS page cache.
+    """
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    metadata = dict(table.schema.metadata or {})
+    metadata[SOURCE_VERSION_KEY] = source_version.encode("utf-8")
+    table = table.replace_schema_metadata(metadata)
+    feather.write_feather(table, str(path), compression="uncompressed")
+
+
+def arrow_source_version(path):
+    """Source CSV version recorded in ``path``, or None if absent."""
+    with pa.memory_map(str(path), "r") as source:
+        metadata = pa.ipc.open_file(source).schema.metadata or {}
+    version = metadata.get(SOURCE_VERSION_KEY)
+    return version.decode("utf-8") if version is not None else None
+
+
+def read_arrow(path):
+    """Memory-map ``path`` and expose it as a DataFrame in the dtype plan.
+
+    Numeric and categorical-code columns without nulls are handed to
+    pandas as views over the mapped pages; booleans and strings, which
+    Arrow stores differently, are converted.
+    """
+    source = pa.memory_map(str(path), "r")
+    table = pa.ipc.open_file(source).read_all()
+    df = table.to_pandas(split_blocks=True)
+    return apply_schema(df)
@@ -0,0 +1,291 @@
+import os
+
+import numpy as np
+import pandas as pd
+import plotly.express as px
+import plotly.graph_objects as go
+import streamlit as st
+
+from utils.data_loader import dataset_version, load_data
+from utils.filter_index import filtered_rows, select_columns
+from utils.partitions import read_partitions
+from utils.profiler import profiled
+
+# ======================================================
+# LARGE SCATTER SETTINGS
+# ======================================================
+# Above this many rows a scatter is no longer sent point by point.
+SCATTER_ROW_THRESHOLD = int(os.environ.get("CHURN_SCATTER_ROW_THRESHOLD", "20000"))
+
+# "sample" keeps a stratified per-colour sample, "density" bins into a 2D heatmap.
+SCATTER_MODE = os.environ.get("CHURN_SCATTER_MODE", "sample")
+
+SCATTER_SAMPLE_SIZE = 10000
+SCATTER_MIN_PER_GROUP = 200
+SCATTER_MAX_OUTLIERS = 2000
+DENSITY_BINS = 60
+
+# Outliers drawn per box; the most extreme points are kept.
+BOX_MAX_OUTLIERS = 50
+
+
+# ======================================================
+# SCATTER WITH AUTOMATIC DOWNSAMPLING
+# ======================================================
+def scatter_chart(df, x, y, color, size=None, hover_data=None,
+                  threshold=None, mode=None):
+    """Build a scatter, aggregating on the server when ``df`` is large.
+
+    When the view is aggregated, a short description is attached to the
+    figure; read it back with ``figure_note`` to display under the chart.
+    """
+    threshold = SCATTER_ROW_THRESHOLD if threshold is None else threshold
+    mode = SCATTER_MODE if mode is None else mode
+
+    if len(df) <= threshold:
+        return px.scatter(df, x=x, y=y, color=color, size=size, hover_data=hover_data)
+
+    if mode == "density":
+        fig = density_heatmap(df, x, y)
+        note = (
+            f"ℹ️ Aggregated view: {len(df):,} customers binned into a "
+            f"{DENSITY_BINS}×{DENSITY_BINS} density grid."
+        )
+        return with_note(fig, note)
+
+    sample = stratified_sample(df, x, y, color)
+    fig = px.scatter(
+        sample,
+        x=x,
+        y=y,
+        color=color,
+        size=size,
+        hover_data=hover_data,
+        render_mode="webgl"
+    )
+    note = (
+        f"ℹ️ Aggregated view: showing a stratified sample of {len(sample):,} "
+        f"of {len(df):,} customers per {color.replace('_', ' ')}, outliers kept."
+    )
+    return with_note(fig, note)
+
+
+def with_note(fig, note):
+    """Attach a display note to ``fig``; it survives JSON round-trips."""
+    fig.update_layout(meta={"note": note})
+    return fig
+
+
+def figure_note(fig):
+    """The note attached by ``with_note``, or None."""
+    meta = fig.layout.meta
+    return meta.get("note") if isinstance(meta, dict) else None
+
+
+@profiled("aggregate")
+def stratified_sample(df, x, y, color, sample_size=SCATTER_SAMPLE_SIZE,
+                      min_per_group=SCATTER_MIN_PER_GROUP,
+                      max_outliers=SCATTER_MAX_OUTLIERS):
+    """Sample ``df`` proportionally per ``color`` group and keep outliers.
+
+    Outliers are rows outside the Tukey fences (1.5 × IQR) on ``x`` or
+    ``y``; the most extreme ``max_outliers`` of them are always kept.
+    """
+    groups = df.groupby(color, observed=True).indices
+    total = len(df)
+    rng = np.random.default_rng(0)
+
+    picked = []
+    for positions in groups.values():
+        n = max(min_per_group, round(sample_size * len(positions) / total))
+        n = min(n, len(positions))
+        picked.append(rng.choice(positions, size=n, replace=False))
+
+    outlier_score = np.zeros(total)
+    for col in (x, y):
+        values = df[col].to_numpy(dtype=np.float64)
+        q1, q3 = np.percentile(values, [25, 75])
+        iqr = q3 - q1
+        if iqr == 0:
+            continue
+        distance = np.maximum(q1 - 1.5 * iqr - values, values - q3 - 1.5 * iqr) / iqr
+        outlier_score = np.maximum(outlier_score, distance)
+
+    outliers = np.flatnonzero(outlier_score > 0)
+    if len(outliers) > max_outliers:
+        keep = np.argpartition(outlier_score[outliers], -max_outliers)[-max_outliers:]
+        outliers = outliers[keep]
+    picked.append(outliers)
+
+    positions = np.unique(np.concatenate(picked))
+    return df.take(positions)
+
+
+def density_heatmap(df, x, y, bins=DENSITY_BINS):
+    """2D histogram of ``x`` against ``y`` computed with NumPy."""
+    counts, x_edges, y_edges = np.histogram2d(
+        df[x].to_numpy(dtype=np.float64),
+        df[y].to_numpy(dtype=np.float64),
+        bins=bins
+    )
+    x_centers = (x_edges[:-1] + x_edges[1:]) / 2
+    y_centers = (y_edges[:-1] + y_edges[1:]) / 2
+
+    fig = go.Figure(
+        go.Heatmap(
+            x=x_centers,
+            y=y_centers,
+            z=counts.T,
+            colorscale="Blues",
+            colorbar=dict(title="Customers"),
+            hovertemplate=f"{x}: %{{x:.1f}}<br>{y}: %{{y:.1f}}<br>customers: %{{z}}<extra></extra>"
+        )
+    )
+    fig.update_layout(xaxis_title=x, yaxis_title=y)
+    return fig
+
+
+# ======================================================
+# PRECOMPUTED BOX PLOTS
+# ======================================================
+def box_stats(df, x, y, max_outliers=BOX_MAX_OUTLIERS):
+    """Quartiles, Tukey whiskers and a capped outlier set per ``x`` group.
+
+    Returns one row per group with ``q1``, ``median``, ``q3``,
+    ``lowerfence``, ``upperfence``, ``count`` and an ``outliers`` list.
+    """
+    if df.empty:
+        return pd.DataFrame(columns=[x, "q1", "median", "q3", "lowerfence",
+                                     "upperfence", "count", "outliers"])
+
+    codes, groups = pd.factorize(df[x], sort=True)
+    values = df[y].to_numpy(dtype=np.float64)
+
+    quartiles = (
+        pd.Series(values).groupby(codes).quantile([0.25, 0.5, 0.75]).unstack()
+    )
+    q1 = quartiles[0.25].to_numpy()
+    q3 = quartiles[0.75].to_numpy()
+    iqr = q3 - q1
+    low = (q1 - 1.5 * iqr)[codes]
+    high = (q3 + 1.5 * iqr)[codes]
+
+    inside = (values >= low) & (values <= high)
+    whiskers = pd.Series(values[inside]).groupby(codes[inside]).agg(["min", "max"])
+    whiskers = whiskers.reindex(range(len(groups)))
+
+    outside = np.flatnonzero(~inside)
+    distance = np.maximum(low[outside] - values[outside], values[outside] - high[outside])
+    extreme = (
+        pd.DataFrame({"group": codes[outside], "value": values[outside], "distance": distance})
+        .sort_values(by="distance", ascending=False)
+        .groupby("group")
+        .head(max_outliers)
+        .groupby("group")["value"]
+        .agg(list)
+        .reindex(range(len(groups)))
+    )
+
+    return pd.DataFrame({
+        x: np.asarray(groups),
+        "q1": q1,
+        "median": quartiles[0.5].to_numpy(),
+        "q3": q3,
+        "lowerfence": whiskers["min"].to_numpy(),
+        "upperfence": whiskers["max"].to_numpy(),
+        "count": np.bincount(codes, minlength=len(groups)),
+        "outliers": [v if isinstance(v, list) else [] for v in extreme],
+    })
+
+
+@st.cache_data(max_entries=256, show_spinner=False)
+def _box_summary_for_version(version, x, y, selections, tenure_range, partitioned):
+    if partitioned:
+        rows = read_partitions(selections, tenure_range, [x, y], version=version).frame
+    else:
+        rows = select_columns(
+            load_data(version), filtered_rows(selections, tenure_range, version), [x, y]
+        )
+    return box_stats(rows, x, y)
+
+
+@profiled("aggregate")
+def box_summary(x, y, selections, tenure_range=None, partitioned=False):
+    """``box_stats`` for a filter state, cached per (dataset version, chart, filter state).
+
+    With ``partitioned`` the rows come from the partitioned store, reading
+    only ``x`` and ``y`` of the partitions the filter state can match.
+    """
+    return _box_summary_for_version(dataset_version(), x, y, selections, tenure_range, partitioned)
+
+
+def box_chart(stats, x, y, color=False, order=None):
+    """Draw box plots from ``box_stats`` output.
+
+    With ``color`` each group becomes its own trace, matching
+    ``px.box(..., color=x)``; ``order`` fixes the group order on the axis.
+    """
+    if order is not None:
+        stats = stats.set_index(x).reindex(order).dropna(subset=["q1"]).reset_index()
+
+    palette = px.colors.qualitative.Plotly
+    fig = go.Figure()
+    traces = (
+        [(str(group), stats[stats[x] == group]) for group in stats[x]]
+        if color else [(y, stats)]
+    )
+
+    for i, (name, part) in enumerate(traces):
+        categories = part[x].astype(str).tolist()
+        marker_color = palette[i % len(palette)] if color else palette[0]
+
+        fig.add_trace(go.Box(
+            name=name,
+            x=categories,
+            q1=part["q1"],
+            median=part["median"],
+            q3=part["q3"],
+            lowerfence=part["lowerfence"],
+            upperfence=part["upperfence"],
+            marker_color=marker_color,
+            boxpoints=False,
+            showlegend=color
+        ))
+
+        outlier_x = [c for c, pts in zip(categories, part["outliers"]) for _ in pts]
+        outlier_y = [v for pts in part["outliers"] for v in pts]
+        if outlier_y:
+            fig.add_trace(go.Scatter(
+                x=outlier_x,
+                y=outlier_y,
+                mode="markers",
+                marker=dict(color=marker_color, size=4),
+                name=f"{name} outliers",
+                showlegend=False
+            ))
+
+    fig.update_layout(
+        xaxis_title=x,
+        yaxis_title=y,
+        boxmode="overlay",
+        legend_title_text=x if color else None
+    )
+    return fig
+
+
+# ======================================================
+# PRE-BINNED HISTOGRAMS
+# ======================================================
+def histogram_chart(hist, x, color):
+    """Draw a stacked histogram from pre-binned counts (``cube.histogram``)."""
+    fig = px.bar(
+        hist,
+        x="bin_center",
+        y="count",
+        color=color,
+        hover_data={"bin_start": ":.1f", "bin_end": ":.1f", "bin_center": False}
+    )
+    widths = (hist["bin_end"] - hist["bin_start"]).to_numpy()
+    fig.update_traces(width=widths[0] if len(widths) else None)
+    fig.update_layout(bargap=0, barmode="relative", xaxis_title=x, yaxis_title="count")
+    return fig
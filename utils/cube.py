@@ -0,0 +1,328 @@
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from utils.data_loader import RETAINED_VERSIONS, changed_rows, dataset_version, delta_for_version
+from utils.features import load_enriched_data
+from utils.filter_index import FILTER_DIMENSIONS, RANGE_COLUMN, select_columns
+from utils.memory import register_shared
+from utils.profiler import profiled
+
+# ======================================================
+# CUBE LAYOUT
+# ======================================================
+CUBE_DIMENSIONS = FILTER_DIMENSIONS
+
+MEASURES = [
+    "total_revenue",
+    "monthly_charges",
+    "cltv",
+    "satisfaction_score",
+    "churn_score",
+    "churn_value",
+    "tenure_in_months",
+]
+
+# Width of the tenure buckets in months. With one-month buckets every
+# slider position lines up with bucket edges, so the cube serves any range.
+TENURE_BUCKET_WIDTH = 1
+
+# Columns with pre-binned histograms: column -> number of equal-width bins.
+# Bin edges are fixed over the full dataset so counts stay comparable
+# across filter states.
+HISTOGRAM_BINS = {
+    "churn_score": 30,
+}
+
+
+# ======================================================
+# MATERIALISED CUBE
+# ======================================================
+class AggregateCube:
+    """count / sum / sum-of-squares per cell of the filter cross product.
+
+    Cells are the observed combinations of the filter dimensions and the
+    tenure buckets. KPIs and group-bys over those dimensions are answered
+    by rolling up matching cells, in time proportional to the number of
+    cells instead of the number of customers. Each cell also carries
+    histogram bin counts for the columns in ``HISTOGRAM_BINS``.
+    """
+
+    def __init__(self, df, dimensions=CUBE_DIMENSIONS, measures=MEASURES,
+                 bucket_width=TENURE_BUCKET_WIDTH, histograms=HISTOGRAM_BINS):
+        self.dimensions = list(dimensions)
+        self.measures = list(measures)
+        self.bucket_width = bucket_width
+        self.histogram_edges = {
+            col: np.histogram_bin_edges(df[col].to_numpy(dtype=np.float64), bins=bins)
+            for col, bins in histograms.items()
+        }
+
+        tenure = df[RANGE_COLUMN].to_numpy().astype(np.int64)
+        self.tenure_min = int(tenure.min())
+        self.tenure_max = int(tenure.max())
+
+        values = pd.DataFrame(index=df.index)
+        for col in self.dimensions:
+            values[col] = df[col]
+        values["tenure_bucket"] = (tenure - self.tenure_min) // bucket_width
+        values["count"] = 1
+        for m in self.measures:
+            column = df[m].to_numpy().astype(np.float64)
+            values[f"{m}_sum"] = column
+            values[f"{m}_sumsq"] = column * column
+
+        keys = self.dimensions + ["tenure_bucket"]
+        cells = values.groupby(keys, observed=True).sum()
+
+        for col, edges in self.histogram_edges.items():
+            bins = pd.DataFrame({key: values[key] for key in keys})
+            bins["bin"] = bin_codes(df[col], edges)
+            counts = (
+                bins.groupby(keys + ["bin"], observed=True)
+                .size()
+                .unstack("bin", fill_value=0)
+                .reindex(columns=range(len(edges) - 1), fill_value=0)
+                .astype(np.int32)
+            )
+            counts.columns = histogram_columns(col, edges)
+            cells = cells.join(counts)
+
+        self.cells = cells.reset_index()
+
+    def updated(self, old_df, new_df):
+        """A copy of this cube over ``new_df``: ``old_df`` plus a delta.
+
+        The old contributions of changed rows are subtracted from their
+        cells and the new ones of changed and appended rows added, so the
+        cost follows the size of the delta. Returns None when new values
+        fall outside the tenure range or histogram edges fixed at build
+        time; the caller then materialises the cube from scratch.
+        """
+        tenure = new_df[RANGE_COLUMN].to_numpy()
+        if tenure.min() < self.tenure_min or tenure.max() > self.tenure_max:
+            return None
+        for col, edges in self.histogram_edges.items():
+            values = new_df[col].to_numpy(dtype=np.float64)
+            if values.min() < edges[0] or values.max() > edges[-1]:
+                return None
+
+        columns = self.dimensions + [RANGE_COLUMN] + self.measures + list(self.histogram_edges)
+        changed = np.unique(np.concatenate(
+            [changed_rows(old_df[col], new_df[col]) for col in columns]
+        ))
+        touched = np.concatenate([changed, np.arange(len(old_df), len(new_df))])
+
+        keys = self.dimensions + ["tenure_bucket"]
+        removed = self._cell_values(old_df.take(changed))
+        stats = [col for col in removed.columns if col not in keys]
+        removed[stats] = -removed[stats]
+        added = self._cell_values(new_df.take(touched))
+
+        cells = self.cells.copy()
+        for dim in self.dimensions:
+            if isinstance(new_df[dim].dtype, pd.CategoricalDtype):
+                categories = new_df[dim].cat.categories
+                for part in (cells, removed, added):
+                    part[dim] = part[dim].cat.set_categories(categories)
+
+        combined = pd.concat([cells, removed, added], ignore_index=True)
+        combined = combined.groupby(keys, observed=True).sum().reset_index()
+        combined = combined[combined["count"] > 0].reset_index(drop=True)
+        for col in stats:
+            combined[col] = combined[col].astype(self.cells[col].dtype)
+
+        cube = AggregateCube.__new__(AggregateCube)
+        cube.__dict__.update(self.__dict__)
+        cube.cells = combined
+        return cube
+
+    def _cell_values(self, df):
+        """Per-row cell keys and statistics; summed by key they give cells."""
+        tenure = df[RANGE_COLUMN].to_numpy().astype(np.int64)
+        values = pd.DataFrame({col: df[col].reset_index(drop=True) for col in self.dimensions})
+        values["tenure_bucket"] = (tenure - self.tenure_min) // self.bucket_width
+        values["count"] = 1
+        for m in self.measures:
+            column = df[m].to_numpy().astype(np.float64)
+            values[f"{m}_sum"] = column
+            values[f"{m}_sumsq"] = column * column
+        for col, edges in self.histogram_edges.items():
+            codes = bin_codes(df[col], edges)
+            for i, name in enumerate(histogram_columns(col, edges)):
+                values[name] = (codes == i).astype(np.int32)
+        return values
+
+    def can_serve(self, selections, tenure_range=None, by=None):
+        """Whether the cube holds the granularity needed for this query."""
+        if any(dim not in self.dimensions for dim in selections):
+            return False
+        if by is not None and any(col not in self.dimensions for col in _as_list(by)):
+            return False
+        if tenure_range is not None:
+            low, high = tenure_range
+            if low <= self.tenure_min and high >= self.tenure_max:
+                return True
+            return (
+                (low - self.tenure_min) % self.bucket_width == 0
+                and (high - self.tenure_min + 1) % self.bucket_width == 0
+            )
+        return True
+
+    def rollup(self, selections, tenure_range=None, by=None, columns=None):
+        """Sum the cells matching the filter, optionally grouped by ``by``.
+
+        ``columns`` picks the summed cell columns; by default the count and
+        the sum / sum-of-squares of every measure.
+        """
+        cells = self.cells
+        mask = np.ones(len(cells), dtype=bool)
+        for dim, selected in selections.items():
+            mask &= cells[dim].isin(selected).to_numpy()
+        if tenure_range is not None:
+            low, high = tenure_range
+            first = (low - self.tenure_min) // self.bucket_width
+            last = (high - self.tenure_min) // self.bucket_width
+            mask &= cells["tenure_bucket"].between(first, last).to_numpy()
+
+        if columns is None:
+            columns = self._stat_columns()
+        group_columns = _as_list(by) if by is not None else []
+        matched = cells.loc[mask, group_columns + list(columns)]
+        if by is None:
+            return matched.sum()
+        return matched.groupby(by, observed=True).sum().reset_index()
+
+    def _stat_columns(self):
+        columns = ["count"]
+        for m in self.measures:
+            columns += [f"{m}_sum", f"{m}_sumsq"]
+        return columns
+
+
+@st.cache_resource(max_entries=RETAINED_VERSIONS)
+def _cube_for_version(version):
+    delta = delta_for_version(version)
+    cube = None
+    if delta is not None:
+        cube = load_cube(delta.base).updated(
+            load_enriched_data(delta.base), load_enriched_data(version)
+        )
+    if cube is None:
+        cube = AggregateCube(load_enriched_data(version))
+    return register_shared(f"aggregate cube {version}", cube)
+
+
+def load_cube(version=None):
+    """The aggregate cube over a dataset version, materialised once per process."""
+    return _cube_for_version(version or dataset_version())
+
+
+# ======================================================
+# QUERY ENTRY POINT
+# ======================================================
+@profiled("aggregate")
+def summarize(rows, selections, tenure_range=None, by=None, df=None):
+    """Aggregate statistics for the current filter state.
+
+    Served from the cube when every filter and grouping column is a cube
+    dimension; otherwise falls back to scanning the grouping and measure
+    columns at ``rows``. Pass ``df`` when ``rows`` index into another frame
+    than the shared dataset, such as a partition read; it is always
+    scanned. Returns a Series of totals when ``by`` is None, else one row
+    per group.
+    """
+    columns = (_as_list(by) if by is not None else []) + MEASURES
+    if df is not None:
+        return summarize_rows(select_columns(df, rows, columns), by)
+    cube = load_cube()
+    if cube.can_serve(selections, tenure_range, by):
+        return cube.rollup(selections, tenure_range, by)
+    return summarize_rows(select_columns(load_enriched_data(), rows, columns), by, cube.measures)
+
+
+def summarize_rows(df, by=None, measures=MEASURES):
+    """Row-scan equivalent of ``AggregateCube.rollup``."""
+    values = pd.DataFrame(index=df.index)
+    for col in _as_list(by) if by is not None else []:
+        values[col] = df[col]
+    values["count"] = 1
+    for m in measures:
+        column = df[m].to_numpy().astype(np.float64)
+        values[f"{m}_sum"] = column
+        values[f"{m}_sumsq"] = column * column
+
+    if by is None:
+        return values.sum()
+    return values.groupby(by, observed=True).sum().reset_index()
+
+
+def mean(summary, measure):
+    """Mean of ``measure`` from a summary; NaN for an empty selection."""
+    count = summary["count"]
+    total = summary[f"{measure}_sum"]
+    if np.ndim(count) == 0:
+        return total / count if count else float("nan")
+    return total / count
+
+
+def std(summary, measure):
+    """Population standard deviation of ``measure`` from a summary."""
+    count = summary["count"]
+    if np.ndim(count) == 0 and not count:
+        return float("nan")
+    avg = mean(summary, measure)
+    variance = summary[f"{measure}_sumsq"] / count - avg * avg
+    return np.sqrt(np.maximum(variance, 0))
+
+
+def _as_list(columns):
+    return [columns] if isinstance(columns, str) else list(columns)
+
+
+# ======================================================
+# PRE-BINNED HISTOGRAMS
+# ======================================================
+def bin_codes(values, edges):
+    """Bin index of every value for fixed ``edges``, clipped to the range."""
+    codes = np.searchsorted(edges, values.to_numpy(dtype=np.float64), side="right") - 1
+    return np.clip(codes, 0, len(edges) - 2)
+
+
+def histogram_columns(column, edges):
+    return [f"{column}_bin{i}" for i in range(len(edges) - 1)]
+
+
+@profiled("aggregate")
+def histogram(rows, column, color, selections, tenure_range=None):
+    """Bin counts of ``column`` split by ``color`` for the current filter.
+
+    Served from the per-cell bin counts in the cube when possible,
+    otherwise counted over the values at ``rows`` with ``np.bincount``. Returns one
+    row per (colour, bin) with the bin edges, centre and count.
+    """
+    cube = load_cube()
+    edges = cube.histogram_edges[column]
+    n_bins = len(edges) - 1
+
+    if cube.can_serve(selections, tenure_range, by=color):
+        wide = cube.rollup(
+            selections, tenure_range, by=color,
+            columns=histogram_columns(column, edges)
+        )
+        groups = wide[color].tolist()
+        counts = wide.drop(columns=color).to_numpy()
+    else:
+        values = select_columns(load_enriched_data(), rows, [color, column])
+        color_codes, uniques = pd.factorize(values[color], sort=True)
+        groups = list(uniques)
+        flat = color_codes * n_bins + bin_codes(values[column], edges)
+        counts = np.bincount(flat, minlength=len(groups) * n_bins).reshape(-1, n_bins)
+
+    return pd.DataFrame({
+        color: np.repeat(groups, n_bins),
+        "bin_start": np.tile(edges[:-1], len(groups)),
+        "bin_end": np.tile(edges[1:], len(groups)),
+        "bin_center": np.tile((edges[:-1] + edges[1:]) / 2, len(groups)),
+        "count": counts.reshape(-1),
+    })
@@ -0,0 +1,416 @@
+import hashlib
+import os
+import threading
+from collections import deque
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+from pandas.arrays import ArrowExtensionArray
+from pandas.core.arrays import BaseMaskedArray
+from pandas.core.arrays._mixins import NDArrayBackedExtensionArray
+from pathlib import Path
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+from utils.arrow_store import arrow_source_version, read_arrow
+from utils.memory import register_shared
+from utils.parquet_store import partitioned_source_version
+from utils.schema import read_csv
+
+# ======================================================
+# DATASET LOCATION
+# ======================================================
+BASE_PATH = Path(__file__).resolve().parent.parent
+# CHURN_DATA_PATH points the app at another extract with the same schema,
+# e.g. a synthetic dataset from scripts/generate_dataset.py.
+DATA_PATH = Path(os.environ.get("CHURN_DATA_PATH", BASE_PATH / "data" / "final_dataset.csv"))
+
+# Memory-mappable copy written by scripts/prepare_dataset.py.
+ARROW_PATH = DATA_PATH.with_suffix(".arrow")
+
+# Partitioned Parquet store written by scripts/prepare_dataset.py --parquet,
+# read per filter state by pages 1 and 4 (see utils.partitions).
+PARQUET_PATH = DATA_PATH.with_suffix(".parquet")
+
+# Append/upsert files keyed on customer_id, merged into the served dataset
+# by the background refresher (see utils.refresh).
+DELTA_PATH = Path(os.environ.get("CHURN_DELTA_PATH", DATA_PATH.parent / "deltas"))
+
+KEY_COLUMN = "customer_id"
+
+# Dataset versions kept loaded by every version-keyed cache: the one being
+# served, the one it replaced (sessions still pinned to it) and the one
+# the background refresher is building.
+RETAINED_VERSIONS = 3
+
+# Session state key holding the version a session's runs read.
+PIN_KEY = "_dataset_version"
+
+
+# ======================================================
+# DATASET VERSIONS
+# ======================================================
+class DatasetChangedError(RuntimeError):
+    """Raised when the data file changes while a version is being read."""
+
+
+def file_signature(path):
+    """Cheap change check for a data file: its size and modification time."""
+    stat = Path(path).stat()
+    return f"{stat.st_size}-{stat.st_mtime_ns}"
+
+
+def content_version(path):
+    """Identify a data file revision by a hash of its content."""
+    digest = hashlib.blake2b(digest_size=8)
+    with open(path, "rb") as handle:
+        for block in iter(lambda: handle.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class DatasetVersions:
+    """The dataset version served to new runs, swapped in atomically.
+
+    ``current`` changes only once every shared object of the new version
+    has been built (see ``utils.refresh``); until then runs keep reading
+    the previous version.
+    """
+
+    def __init__(self, path=DATA_PATH):
+        self.signature = file_signature(path)
+        self.current = content_version(path)
+        self.previous = None
+        self.recent = deque([self.current], maxlen=RETAINED_VERSIONS)
+        self._lock = threading.Lock()
+
+    def publish(self, version, signature):
+        with self._lock:
+            if version != self.current:
+                self.previous, self.current = self.current, version
+                self.recent.append(version)
+            self.signature = signature
+
+    def retained(self):
+        """The last ``RETAINED_VERSIONS`` published versions, which the loaders keep."""
+        with self._lock:
+            return set(self.recent)
+
+    def is_served(self, version):
+        return version in (self.current, self.previous)
+
+
+@st.cache_resource
+def load_dataset_versions():
+    """The published dataset version of this process."""
+    return DatasetVersions()
+
+
+def pin_dataset_version():
+    """Serve this session's runs from the currently published version.
+
+    Called at the top of every data page. Fragment reruns keep the
+    version of the full run whose arguments they reuse, so a swap reaches
+    a session at its next full run and never mid-page.
+    """
+    if get_script_run_ctx(suppress_warning=True) is not None:
+        st.session_state[PIN_KEY] = load_dataset_versions().current
+
+
+def dataset_version():
+    """Version tag of the dataset this run reads."""
+    versions = load_dataset_versions()
+    if get_script_run_ctx(suppress_warning=True) is None:
+        return versions.current
+
+    pinned = st.session_state.get(PIN_KEY)
+    if pinned is None:
+        return versions.current
+    if not versions.is_served(pinned):
+        # Two swaps since this session's last full run: the version its
+        # fragment arguments came from is gone, so start the page over.
+        st.session_state[PIN_KEY] = versions.current
+        st.rerun()
+    return pinned
+
+
+# ======================================================
+# SHARED LOADER
+# ======================================================
+@st.cache_resource(max_entries=RETAINED_VERSIONS)
+def _dataset_for_version(version):
+    delta = delta_for_version(version)
+    if delta is not None:
+        df = merge_delta(load_data(delta.base), delta.frame)
+    elif arrow_is_current(version):
+        df = read_arrow(ARROW_PATH)
+    else:
+        df = read_csv(DATA_PATH)
+        if content_version(DATA_PATH) != version:
+            raise DatasetChangedError(f"{DATA_PATH} changed while reading version {version}")
+    df.attrs["dataset_version"] = version
+    return register_shared(f"dataset {version}", freeze(df))
+
+
+def load_data(version=None):
+    """Load final_dataset once per version and share it across pages.
+
+    ``version`` defaults to the version this run is pinned to. When an
+    Arrow file prepared from that CSV revision exists, it is
+    memory-mapped instead of parsing the CSV, so several server processes
+    on one host share its pages. Columns follow the compact dtype plan
+    from ``utils.schema``.
+    Every page and session receives the same read-only DataFrame object;
+    in-place changes raise ``SharedDataMutationError``, so build new frames
+    (or call ``.copy()``) instead of assigning onto it.
+    """
+    return _dataset_for_version(version or dataset_version())
+
+
+def arrow_is_current(version):
+    """Whether ARROW_PATH exists and was built from CSV revision ``version``."""
+    return ARROW_PATH.exists() and arrow_source_version(ARROW_PATH) == version
+
+
+def parquet_is_current(version):
+    """Whether PARQUET_PATH exists and was built from CSV revision ``version``."""
+    return partitioned_source_version(PARQUET_PATH) == version
+
+
+# ======================================================
+# DELTA INGEST
+# ======================================================
+class DatasetDelta:
+    """An append/upsert file applied on top of a base dataset version.
+
+    Customers already in the base are replaced in place, so row positions
+    of unchanged customers stay valid; new customers are appended.
+    """
+
+    def __init__(self, base, path):
+        self.base = base
+        self.path = Path(path)
+        self.frame = read_csv(self.path).drop_duplicates(KEY_COLUMN, keep="last")
+
+        digest = hashlib.blake2b(digest_size=8)
+        digest.update(f"{base}+{content_version(self.path)}".encode("utf-8"))
+        self.version = digest.hexdigest()
+
+
+class DeltaRegistry:
+    """Delta versions of this process, by version tag."""
+
+    def __init__(self):
+        self.deltas = {}
+        self._lock = threading.Lock()
+
+    def register(self, base, path):
+        delta = DatasetDelta(base, path)
+        with self._lock:
+            self.deltas[delta.version] = delta
+        return delta
+
+    def get(self, version):
+        with self._lock:
+            return self.deltas.get(version)
+
+    def prune(self, retained):
+        """Drop the deltas whose base version is no longer in ``retained``."""
+        with self._lock:
+            for version, delta in list(self.deltas.items()):
+                if delta.base not in retained:
+                    del self.deltas[version]
+
+
+@st.cache_resource
+def load_delta_registry():
+    return DeltaRegistry()
+
+
+def delta_for_version(version):
+    """The ``DatasetDelta`` that produced ``version``, or None for a file version."""
+    return load_delta_registry().get(version)
+
+
+def merge_delta(base, delta):
+    """``base`` with ``delta``'s customers upserted, as a new frame.
+
+    Categorical columns keep their categories in order and gain any new
+    values at the end, so codes of existing rows are unchanged.
+    """
+    missing = [col for col in base.columns if col not in delta.columns]
+    if missing:
+        raise ValueError(f"Delta file lacks columns: {', '.join(missing)}")
+
+    positions = pd.Index(base[KEY_COLUMN]).get_indexer(delta[KEY_COLUMN])
+    updated = positions >= 0
+    target = positions[updated]
+
+    columns = {}
+    for col in base.columns:
+        old, new = base[col], delta[col]
+        if isinstance(old.dtype, pd.CategoricalDtype):
+            new = new.astype(object)
+            extra = pd.Index(new.dropna().unique()).difference(old.cat.categories, sort=False)
+            categories = old.cat.categories.append(extra)
+            new_codes = categories.get_indexer(new)
+            codes = np.concatenate([old.cat.codes.to_numpy(), new_codes[~updated]])
+            codes[target] = new_codes[updated]
+            columns[col] = pd.Categorical.from_codes(codes, categories)
+        else:
+            merged = pd.concat([old, new[~updated]], ignore_index=True)
+            merged.iloc[target] = new[updated].to_numpy()
+            columns[col] = merged
+
+    return pd.DataFrame(columns)
+
+
+def changed_rows(old, new):
+    """Positions below ``len(old)`` where Series ``new`` differs from ``old``.
+
+    Categoricals are compared by label; ``new`` may be longer than ``old``.
+    """
+    n_old = len(old)
+    if isinstance(old.dtype, pd.CategoricalDtype):
+        categories = old.cat.categories
+        old_values = old.cat.codes.to_numpy()
+        if not categories.equals(new.cat.categories[:len(categories)]):
+            remap = new.cat.categories.get_indexer(categories)
+            old_values = np.where(old_values >= 0, remap[old_values], -1)
+        new_values = new.cat.codes.to_numpy()[:n_old]
+    else:
+        old_values = old.to_numpy()
+        new_values = new.to_numpy()[:n_old]
+    return np.flatnonzero(old_values != new_values)
+
+
+# ======================================================
+# READ-ONLY GUARDS
+# ======================================================
+class SharedDataMutationError(TypeError):
+    """Raised when code tries to modify the shared dataset in place."""
+
+
+_MUTATION_MESSAGE = (
+    "The shared dataset is read-only. Build a new frame "
+    "(e.g. with .assign() or .copy()) instead of modifying it in place."
+)
+
+
+class _ReadOnlyIndexer:
+    """Wraps .loc / .iloc / .at / .iat so reads work and writes raise."""
+
+    def __init__(self, indexer):
+        self._indexer = indexer
+
+    def __call__(self, *args, **kwargs):
+        return _ReadOnlyIndexer(self._indexer(*args, **kwargs))
+
+    def __getitem__(self, key):
+        return self._indexer[key]
+
+    def __setitem__(self, key, value):
+        raise SharedDataMutationError(_MUTATION_MESSAGE)
+
+
+class ReadOnlyFrame(pd.DataFrame):
+    """DataFrame view over shared, non-writeable column buffers.
+
+    Column assignment, indexer writes, ``columns``/``index`` assignment and
+    ``inplace=True`` operations raise ``SharedDataMutationError``. Anything
+    derived from it (filters, group-bys, ``.copy()``) is an ordinary,
+    writeable DataFrame.
+    """
+
+    @property
+    def _constructor(self):
+        return pd.DataFrame
+
+    @property
+    def columns(self):
+        return pd.DataFrame.columns.__get__(self)
+
+    @columns.setter
+    def columns(self, value):
+        raise SharedDataMutationError(_MUTATION_MESSAGE)
+
+    @property
+    def index(self):
+        return pd.DataFrame.index.__get__(self)
+
+    @index.setter
+    def index(self, value):
+        raise SharedDataMutationError(_MUTATION_MESSAGE)
+
+    def _ixs(self, i, axis=0):
+        # Arrow arrays cannot be marked non-writeable and are modified by
+        # swapping their ChunkedArray, so every access to such a column
+        # gets its own (zero-copy) array and writes to it stay local.
+        if axis == 1 and isinstance(self._mgr.iget_values(i), ArrowExtensionArray):
+            return self._box_col_values(self._mgr.iget(i).copy(deep=True), i)
+        return super()._ixs(i, axis)
+
+    def _get_item_cache(self, item):
+        loc = self.columns.get_loc(item)
+        if isinstance(loc, int) and isinstance(self._mgr.iget_values(loc), ArrowExtensionArray):
+            return self._ixs(loc, axis=1)
+        return super()._get_item_cache(item)
+
+    @property
+    def loc(self):
+        return _ReadOnlyIndexer(super().loc)
+
+    @property
+    def iloc(self):
+        return _ReadOnlyIndexer(super().iloc)
+
+    @property
+    def at(self):
+        return _ReadOnlyIndexer(super().at)
+
+    @property
+    def iat(self):
+        return _ReadOnlyIndexer(super().iat)
+
+    def _read_only(self, *args, **kwargs):
+        raise SharedDataMutationError(_MUTATION_MESSAGE)
+
+    __setitem__ = _read_only
+    __delitem__ = _read_only
+    insert = _read_only
+    isetitem = _read_only
+    pop = _read_only
+    update = _read_only
+    _update_inplace = _read_only
+
+
+def _column_buffers(values):
+    """The NumPy buffers holding ``values``, for ``freeze``."""
+    if isinstance(values, np.ndarray):
+        return [values]
+    if isinstance(values, ArrowExtensionArray):
+        return []
+    if isinstance(values, BaseMaskedArray):
+        return [values._data, values._mask]
+    if isinstance(values, NDArrayBackedExtensionArray):
+        # Categorical codes, datetimes, timedeltas and Python strings.
+        return [values._ndarray]
+    raise TypeError(f"Cannot share a column of {type(values).__name__} read-only.")
+
+
+def freeze(df):
+    """Mark every column buffer of ``df`` non-writeable and wrap it read-only.
+
+    No data is copied: the returned frame shares ``df``'s buffers, and
+    writes through Series or NumPy views of them fail as well. Arrow-backed
+    columns are immutable already and guarded by ``ReadOnlyFrame``; a
+    column of any other array type raises ``TypeError`` rather than being
+    shared writeable.
+    """
+    for block in df._mgr.blocks:
+        for buffer in _column_buffers(block.values):
+            buffer.flags.writeable = False
+
+    frozen = ReadOnlyFrame(df, copy=False)
+    frozen.attrs = dict(df.attrs)
+    return frozen
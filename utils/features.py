@@ -0,0 +1,71 @@
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from utils.data_loader import RETAINED_VERSIONS, dataset_version, freeze, load_data
+from utils.memory import register_shared
+
+# ======================================================
+# TIER DEFINITIONS
+# ======================================================
+CLTV_TIER_LABELS = ["Low Value", "Mid Value", "High Value"]
+RISK_TIER_LABELS = ["Low Risk", "Medium Risk", "High Risk"]
+RETENTION_PRIORITY_LABELS = ["Critical Retention", "High Value - Monitor", "Standard"]
+
+
+# ======================================================
+# DERIVED FEATURES
+# ======================================================
+def derive_features(df):
+    """CLTV tier, churn risk tier and retention priority as categoricals.
+
+    Tiers are terciles of ``cltv`` and ``churn_score`` over the whole
+    dataset. Returns a frame aligned with ``df`` holding only the new
+    columns.
+    """
+    cltv_tier = pd.qcut(df["cltv"], q=3, labels=CLTV_TIER_LABELS)
+    risk_tier = pd.qcut(df["churn_score"], q=3, labels=RISK_TIER_LABELS)
+
+    high_value = (cltv_tier == "High Value").to_numpy()
+    high_risk = (risk_tier == "High Risk").to_numpy()
+    priority_codes = np.select(
+        [high_value & high_risk, high_value],
+        [0, 1],
+        default=2
+    ).astype(np.int8)
+
+    return pd.DataFrame({
+        "cltv_tier": cltv_tier,
+        "risk_tier": risk_tier,
+        "retention_priority": pd.Categorical.from_codes(
+            priority_codes, categories=RETENTION_PRIORITY_LABELS
+        ),
+    }, index=df.index)
+
+
+@st.cache_resource(max_entries=RETAINED_VERSIONS)
+def _features_for_version(version):
+    return register_shared(f"derived features {version}", freeze(derive_features(load_data(version))))
+
+
+@st.cache_resource(max_entries=RETAINED_VERSIONS)
+def _enriched_for_version(version):
+    df = load_data(version)
+    enriched = pd.concat([df, _features_for_version(version)], axis=1, copy=False)
+    enriched.attrs = dict(df.attrs)
+    # Views over the dataset and feature columns; no memory of its own.
+    return register_shared(f"enriched dataset {version}", freeze(enriched), counted=False)
+
+
+def load_features(version=None):
+    """Derived tiers for the current dataset version, computed once and shared."""
+    return _features_for_version(version or dataset_version())
+
+
+def load_enriched_data(version=None):
+    """The shared dataset with the derived tier columns appended.
+
+    Row order matches ``load_data()``, so filter index positions apply to
+    both. Like ``load_data()``, the frame is shared and read-only.
+    """
+    return _enriched_for_version(version or dataset_version())
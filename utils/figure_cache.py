@@ -0,0 +1,161 @@
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+
+import plotly.io as pio
+import streamlit as st
+
+from utils.data_loader import dataset_version
+from utils.memory import register_shared, track_figure
+from utils.profiler import label_figure, timed
+
+# ======================================================
+# CACHE SETTINGS
+# ======================================================
+FIGURE_CACHE_BYTES = int(os.environ.get("CHURN_FIGURE_CACHE_MB", "64")) * 1024 * 1024
+
+
+# ======================================================
+# LRU FIGURE CACHE
+# ======================================================
+class FigureCache:
+    """Serialised Plotly figures, evicted least-recently-used by byte size.
+
+    Entries are ``(payload, nbytes)`` pairs, sized once when stored.
+    """
+
+    def __init__(self, max_bytes=FIGURE_CACHE_BYTES):
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key, payload):
+        nbytes = len(payload.encode("utf-8"))
+        if nbytes > self.max_bytes:
+            return
+        with self._lock:
+            if key in self.entries:
+                self.size -= self.entries.pop(key)[1]
+            self.entries[key] = (payload, nbytes)
+            self.size += nbytes
+            while self.size > self.max_bytes:
+                _, (_, evicted) = self.entries.popitem(last=False)
+                self.size -= evicted
+                self.evictions += 1
+
+    @property
+    def nbytes(self):
+        return self.size
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self.entries),
+                "bytes": self.size,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
+
+
+@st.cache_resource
+def load_figure_cache():
+    """One figure cache per process, shared by every page and session."""
+    return register_shared("figure cache", FigureCache())
+
+
+# ======================================================
+# CANONICAL KEYS
+# ======================================================
+def normalise_filter_state(filter_state):
+    """Order-independent, JSON-serialisable form of a filter state."""
+    normalised = {}
+    for name, value in filter_state.items():
+        if value is None:
+            normalised[name] = None
+        elif isinstance(value, (list, set)):
+            normalised[name] = sorted(str(v) for v in value)
+        elif isinstance(value, tuple):
+            normalised[name] = [_plain(v) for v in value]
+        else:
+            normalised[name] = _plain(value)
+    return normalised
+
+
+def figure_key(page, chart, filter_state, version):
+    """Hash of (page, chart id, normalised filter state, dataset version)."""
+    payload = json.dumps(
+        [page, chart, normalise_filter_state(filter_state), version],
+        sort_keys=True,
+        separators=(",", ":")
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def _plain(value):
+    if hasattr(value, "item"):
+        return value.item()
+    if isinstance(value, (int, float, str, bool)):
+        return value
+    return str(value)
+
+
+# ======================================================
+# PAGE ENTRY POINT
+# ======================================================
+def cached_figure(page, chart, filter_state, build):
+    """Return the figure for this chart and filter state.
+
+    ``build`` is only called on a cache miss; it should contain the
+    chart's aggregation as well as the figure construction.
+    """
+    cache = load_figure_cache()
+    key = figure_key(page, chart, filter_state, dataset_version())
+
+    payload = cache.get(key)
+    if payload is not None:
+        with timed("serialise", chart):
+            fig = pio.from_json(payload, skip_invalid=True)
+    else:
+        with timed("figure", chart):
+            fig = build()
+        with timed("serialise", chart):
+            payload = fig.to_json()
+            cache.put(key, payload)
+
+    track_figure(chart, payload)
+    label_figure(fig, chart)
+    return fig
+
+
+def render_figure_cache_stats():
+    """Collapsed sidebar summary of figure cache hits and misses."""
+    stats = load_figure_cache().stats()
+    with st.sidebar.expander("🗄️ Figure cache", expanded=False):
+        st.caption(
+            f"Hits: {stats['hits']:,} · Misses: {stats['misses']:,} · "
+            f"Hit rate: {stats['hit_rate']:.0%}"
+        )
+        st.caption(
+            f"{stats['entries']:,} figures · {stats['bytes'] / 2**20:,.1f} / "
+            f"{stats['max_bytes'] / 2**20:,.0f} MB · {stats['evictions']:,} evicted"
+        )
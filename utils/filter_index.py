@@ -0,0 +1,347 @@
+import os
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from utils.data_loader import RETAINED_VERSIONS, changed_rows, dataset_version, delta_for_version, freeze
+from utils.features import load_enriched_data
+from utils.memory import register_shared
+
+# ======================================================
+# INDEXED FILTER DIMENSIONS
+# ======================================================
+FILTER_DIMENSIONS = [
+    "contract",
+    "internet_service",
+    "state",
+    "payment_method",
+    "churn_label",
+    "retention_priority",
+]
+
+RANGE_COLUMN = "tenure_in_months"
+
+# Byte budget of the row selections, and the filtered frames built from
+# them, kept for reuse across pages and sessions.
+SELECTION_CACHE_BYTES = int(os.environ.get("CHURN_SELECTION_CACHE_MB", "128")) * 1024 * 1024
+
+
+# ======================================================
+# BITMAP INDEX
+# ======================================================
+class FilterIndex:
+    """Precomputed bitmaps for the sidebar filters shared by pages 1-5.
+
+    Each distinct value of each filter dimension owns a packed bitmap
+    (one bit per row), and ``tenure_in_months`` is kept as a sorted
+    permutation. A filter combination then resolves to bitwise ORs within
+    a dimension and ANDs across dimensions, without touching the frame.
+    """
+
+    def __init__(self, df, dimensions=FILTER_DIMENSIONS, range_column=RANGE_COLUMN):
+        self.n_rows = len(df)
+        self.range_column = range_column
+        self.bitmaps = {dim: self._build_bitmaps(df[dim]) for dim in dimensions}
+
+        values = df[range_column].to_numpy()
+        self.range_order = np.argsort(values, kind="stable")
+        self.range_values = values[self.range_order]
+
+    def _build_bitmaps(self, series):
+        codes, labels = _codes(series)
+        return {
+            label: np.packbits(codes == code)
+            for code, label in enumerate(labels)
+        }
+
+    def updated(self, old_df, new_df):
+        """A copy of this index over ``new_df``: ``old_df`` plus a delta.
+
+        Only bits of rows whose indexed values changed and of appended
+        rows are written, and the tenure order is merged instead of
+        re-sorted. ``self`` is left untouched for the sessions still
+        reading ``old_df``.
+        """
+        n_old, n_new = self.n_rows, len(new_df)
+        appended = np.arange(n_old, n_new)
+
+        index = FilterIndex.__new__(FilterIndex)
+        index.n_rows = n_new
+        index.range_column = self.range_column
+        index.bitmaps = {}
+        for dim, bitmaps in self.bitmaps.items():
+            grown = {label: _resized(bits, (n_new + 7) // 8) for label, bits in bitmaps.items()}
+            changed = changed_rows(old_df[dim], new_df[dim])
+
+            old_codes, old_labels = _codes(old_df[dim].take(changed))
+            for code, rows in _group_rows(old_codes, changed):
+                _clear_bits(grown[old_labels[code]], rows)
+
+            touched = np.concatenate([changed, appended])
+            new_codes, new_labels = _codes(new_df[dim].take(touched))
+            for code, rows in _group_rows(new_codes, touched):
+                label = new_labels[code]
+                if label not in grown:
+                    grown[label] = np.zeros((n_new + 7) // 8, dtype=np.uint8)
+                _set_bits(grown[label], rows)
+            index.bitmaps[dim] = grown
+
+        values = new_df[self.range_column].to_numpy()
+        changed = changed_rows(old_df[self.range_column], new_df[self.range_column])
+        moved = np.zeros(n_old, dtype=bool)
+        moved[changed] = True
+        keep = ~moved[self.range_order]
+        order, ordered = self.range_order[keep], self.range_values[keep]
+
+        touched = np.concatenate([changed, appended])
+        inserted = np.argsort(values[touched], kind="stable")
+        rows, row_values = touched[inserted], values[touched][inserted]
+        at = np.searchsorted(ordered, row_values, side="right")
+        index.range_order = np.insert(order, at, rows)
+        index.range_values = np.insert(ordered, at, row_values)
+        return index
+
+    def _full(self):
+        return np.packbits(np.ones(self.n_rows, dtype=bool))
+
+    def _empty(self):
+        return np.zeros((self.n_rows + 7) // 8, dtype=np.uint8)
+
+    def _dimension_bits(self, dim, values):
+        bitmaps = self.bitmaps[dim]
+        selected = [bitmaps[v] for v in values if v in bitmaps]
+        if len(selected) == len(bitmaps):
+            return None
+        if not selected:
+            return self._empty()
+        return np.bitwise_or.reduce(selected)
+
+    def _range_bits(self, low, high):
+        if low <= self.range_values[0] and high >= self.range_values[-1]:
+            return None
+        start = np.searchsorted(self.range_values, low, side="left")
+        stop = np.searchsorted(self.range_values, high, side="right")
+        mask = np.zeros(self.n_rows, dtype=bool)
+        mask[self.range_order[start:stop]] = True
+        return np.packbits(mask)
+
+    def selection_key(self, selections, tenure_range=None):
+        """Canonical form of the constraints a filter state actually applies.
+
+        Dimensions with every value selected and a full tenure range drop
+        out, so pages with different widgets but the same effective
+        filters share one key.
+        """
+        key = []
+        for dim, values in sorted(selections.items()):
+            bitmaps = self.bitmaps[dim]
+            chosen = {v for v in values if v in bitmaps}
+            if len(chosen) < len(bitmaps):
+                key.append((dim, tuple(sorted(map(str, chosen)))))
+        if tenure_range is not None:
+            low, high = tenure_range
+            if low > self.range_values[0] or high < self.range_values[-1]:
+                key.append((RANGE_COLUMN, (int(low), int(high))))
+        return tuple(key)
+
+    def select(self, selections, tenure_range=None, mask=None):
+        """Return the row positions matching every filter.
+
+        ``selections`` maps an indexed dimension to its selected values,
+        ``tenure_range`` is an inclusive ``(low, high)`` pair, and ``mask``
+        is an optional extra boolean row mask for non-indexed filters.
+        """
+        parts = [self._dimension_bits(dim, values) for dim, values in selections.items()]
+        if tenure_range is not None:
+            parts.append(self._range_bits(*tenure_range))
+        if mask is not None:
+            parts.append(np.packbits(np.asarray(mask, dtype=bool)))
+
+        parts = [p for p in parts if p is not None]
+        if not parts:
+            return np.arange(self.n_rows)
+
+        bits = np.bitwise_and.reduce(parts) if len(parts) > 1 else parts[0]
+        return np.flatnonzero(np.unpackbits(bits, count=self.n_rows))
+
+
+def _codes(series):
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        return series.cat.codes.to_numpy(), series.cat.categories
+    return pd.factorize(series)
+
+
+def _group_rows(codes, rows):
+    """(code, rows) pairs for every valid code in ``codes``."""
+    for code in np.unique(codes[codes >= 0]):
+        yield code, rows[codes == code]
+
+
+def _resized(bits, n_bytes):
+    grown = np.zeros(n_bytes, dtype=np.uint8)
+    grown[:len(bits)] = bits
+    return grown
+
+
+def _set_bits(bits, rows):
+    np.bitwise_or.at(bits, rows >> 3, (0x80 >> (rows & 7)).astype(np.uint8))
+
+
+def _clear_bits(bits, rows):
+    np.bitwise_and.at(bits, rows >> 3, ~(0x80 >> (rows & 7)).astype(np.uint8))
+
+
+def select_rows(df, rows):
+    """Return the rows of ``df`` at ``rows``, reusing ``df`` when all match."""
+    if len(rows) == len(df):
+        return df
+    return df.take(rows)
+
+
+def select_columns(df, rows, columns):
+    """``columns`` of ``df`` at ``rows``, reusing ``df`` when all match.
+
+    Otherwise only ``columns`` are copied into the new frame.
+    """
+    if len(rows) == len(df):
+        return df
+    return pd.DataFrame({col: df[col].take(rows) for col in columns})
+
+
+@st.cache_resource(max_entries=RETAINED_VERSIONS)
+def _filter_index_for_version(version):
+    delta = delta_for_version(version)
+    if delta is not None:
+        index = load_filter_index(delta.base).updated(
+            load_enriched_data(delta.base), load_enriched_data(version)
+        )
+    else:
+        index = FilterIndex(load_enriched_data(version))
+    return register_shared(f"filter index {version}", index)
+
+
+def load_filter_index(version=None):
+    """The filter index over a dataset version, built once per process."""
+    return _filter_index_for_version(version or dataset_version())
+
+
+# ======================================================
+# SHARED SELECTION CACHE
+# ======================================================
+class Selection:
+    """Row positions of one filter state and the frames filtered by them.
+
+    Frames are built on first use and accounted to the owning cache.
+    """
+
+    def __init__(self, rows, cache):
+        rows.setflags(write=False)
+        self.rows = rows
+        self.nbytes = rows.nbytes
+        self._frames = {}
+        self._cache = cache
+        self._lock = threading.Lock()
+
+    def frame(self, df):
+        """``select_rows(df, rows)``, built once per source frame."""
+        with self._lock:
+            cached = self._frames.get(id(df))
+            if cached is None or cached[0] is not df:
+                filtered = select_rows(df, self.rows)
+                nbytes = 0
+                if filtered is not df:
+                    filtered = freeze(filtered)
+                    nbytes = int(filtered.memory_usage(deep=True).sum())
+                cached = self._frames[id(df)] = (df, filtered)
+                self._cache.grow(self, nbytes)
+            return cached[1]
+
+    def frames(self):
+        with self._lock:
+            return [filtered for _, filtered in self._frames.values()]
+
+
+class SelectionCache:
+    """Selections keyed by canonical filter state, evicted least-recently-used by byte size."""
+
+    def __init__(self, max_bytes=SELECTION_CACHE_BYTES):
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()
+        self.size = 0
+        self._lock = threading.Lock()
+
+    def get(self, key, build):
+        with self._lock:
+            selection = self.entries.get(key)
+            if selection is not None:
+                self.entries.move_to_end(key)
+                return selection
+
+        selection = Selection(build(), self)
+        with self._lock:
+            if key in self.entries:
+                self.size -= self.entries.pop(key).nbytes
+            self.entries[key] = selection
+            self.size += selection.nbytes
+            self._evict()
+        return selection
+
+    def grow(self, selection, nbytes):
+        """Account ``nbytes`` more held by ``selection``, if still cached."""
+        with self._lock:
+            selection.nbytes += nbytes
+            if any(entry is selection for entry in self.entries.values()):
+                self.size += nbytes
+                self._evict()
+
+    def _evict(self):
+        while self.size > self.max_bytes and self.entries:
+            _, evicted = self.entries.popitem(last=False)
+            self.size -= evicted.nbytes
+
+    @property
+    def nbytes(self):
+        return self.size
+
+    def owns(self, frame):
+        """Whether ``frame`` is a filtered frame of a cached selection (see ``utils.memory``)."""
+        with self._lock:
+            selections = list(self.entries.values())
+        return any(filtered is frame for selection in selections for filtered in selection.frames())
+
+
+@st.cache_resource
+def load_selection_cache():
+    """One selection cache per process, shared by every page and session."""
+    return register_shared("selection cache", SelectionCache())
+
+
+def selection_for(selections, tenure_range=None, version=None):
+    """The cached ``Selection`` for a filter state on a dataset version."""
+    version = version or dataset_version()
+    index = load_filter_index(version)
+    key = (version, index.selection_key(selections, tenure_range))
+    return load_selection_cache().get(
+        key, lambda: index.select(selections, tenure_range=tenure_range)
+    )
+
+
+def filtered_rows(selections, tenure_range=None, version=None):
+    """Row positions matching a filter state, reused across reruns, pages and sessions.
+
+    Pages pass these to the cube, histogram and query functions instead of
+    a filtered copy of the frame.
+    """
+    return selection_for(selections, tenure_range, version).rows
+
+
+def select_filtered(df, selections, tenure_range=None):
+    """Read-only view of ``df`` filtered to a filter state.
+
+    Only for consumers that need whole rows, such as the scatter plots;
+    the frame is built on first use and shared through the selection cache.
+    """
+    return selection_for(selections, tenure_range).frame(df)
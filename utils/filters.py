@@ -0,0 +1,96 @@
+import os
+
+import streamlit as st
+
+from utils.schema import filter_options
+
+# ======================================================
+# GLOBAL FILTER MODEL
+# ======================================================
+# One filter state per session, shared by every page: a value chosen on
+# one page is the default of the same filter on the next.
+FILTER_STATE_KEY = "global_filters"
+
+# Set CHURN_FILTER_URL=1 to mirror the filters in the URL query string,
+# so a filtered view can be bookmarked or shared.
+FILTER_URL_ENABLED = os.environ.get("CHURN_FILTER_URL", "").lower() in ("1", "true", "yes")
+
+TENURE_COLUMN = "tenure_in_months"
+
+
+def filter_state():
+    """This session's shared filter values, keyed by column."""
+    return st.session_state.setdefault(FILTER_STATE_KEY, {})
+
+
+def _initial(column, parse):
+    state = filter_state()
+    if column in state:
+        return state[column]
+    if FILTER_URL_ENABLED and column in st.query_params:
+        try:
+            return parse(st.query_params.get_all(column))
+        except ValueError:
+            return None
+    return None
+
+
+def _publish(column, value, is_default, encode):
+    filter_state()[column] = value
+    if not FILTER_URL_ENABLED:
+        return
+    if is_default:
+        if column in st.query_params:
+            del st.query_params[column]
+    else:
+        st.query_params[column] = encode(value)
+
+
+# ======================================================
+# SIDEBAR WIDGETS
+# ======================================================
+def filter_multiselect(df, column, label):
+    """Sidebar multiselect over ``column`` bound to the shared filter state."""
+    options = filter_options(df, column)
+    initial = _initial(column, list)
+    if initial is None:
+        default = options
+    else:
+        chosen = set(map(str, initial))
+        default = [v for v in options if str(v) in chosen]
+
+    value = st.sidebar.multiselect(
+        label,
+        options=options,
+        default=default,
+        key=f"filter_{column}"
+    )
+
+    _publish(column, value, len(value) == len(options), lambda v: [str(x) for x in v])
+    return value
+
+
+def tenure_slider(df, label="Tenure (Months)"):
+    """Sidebar tenure range slider bound to the shared filter state."""
+    low = int(df[TENURE_COLUMN].min())
+    high = int(df[TENURE_COLUMN].max())
+
+    def parse(values):
+        start, stop = (int(part) for part in values[0].split("-"))
+        return start, stop
+
+    initial = _initial(TENURE_COLUMN, parse)
+    if initial is None:
+        initial = (low, high)
+    initial = (max(low, initial[0]), min(high, initial[1]))
+
+    value = st.sidebar.slider(
+        label,
+        low,
+        high,
+        initial,
+        key=f"filter_{TENURE_COLUMN}"
+    )
+
+    _publish(TENURE_COLUMN, value, value == (low, high), lambda v: f"{v[0]}-{v[1]}")
+    return value
@@ -0,0 +1,150 @@
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from utils.data_loader import (
+    RETAINED_VERSIONS,
+    changed_rows,
+    dataset_version,
+    delta_for_version,
+    load_data
+)
+from utils.memory import register_shared
+from utils.profiler import profiled
+
+# ======================================================
+# AGGREGATION LEVELS
+# ======================================================
+# Grid levels are square cells in degrees; named levels roll customers up
+# to the given column.
+GEO_LEVELS = {
+    "Coarse grid (1°)": 1.0,
+    "Medium grid (0.25°)": 0.25,
+    "Fine grid (0.05°)": 0.05,
+    "City": "city",
+    "Zip code": "zip_code",
+}
+
+DEFAULT_GEO_LEVEL = "Medium grid (0.25°)"
+
+
+# ======================================================
+# PRE-BINNED GEO INDEX
+# ======================================================
+class GeoIndex:
+    """Per-row bin codes for every aggregation level, computed once.
+
+    For a filter state, bins are rolled up with ``np.bincount`` over the
+    selected rows, so the map payload depends on the number of bins
+    rather than the number of customers.
+    """
+
+    def __init__(self, df, levels=GEO_LEVELS):
+        self.levels = dict(levels)
+        self._set_values(df)
+
+        self.codes = {}
+        self.keys = {}
+        self.labels = {}
+        for name, spec in self.levels.items():
+            keys = self._bin_keys(df, spec)
+            # An empty MultiIndex cannot be factorized; it has no bins anyway.
+            codes, uniques = keys.factorize() if len(keys) else (np.empty(0, dtype=np.intp), keys)
+            self.codes[name] = codes.astype(np.int32)
+            self.keys[name] = uniques
+            self.labels[name] = self._labels(uniques, spec)
+
+    def _set_values(self, df):
+        self.latitude = df["latitude"].to_numpy(dtype=np.float64)
+        self.longitude = df["longitude"].to_numpy(dtype=np.float64)
+        self.churn_value = df["churn_value"].to_numpy(dtype=np.float64)
+        self.monthly_charges = df["monthly_charges"].to_numpy(dtype=np.float64)
+
+    @staticmethod
+    def _bin_keys(df, spec):
+        """Bin key of every row of ``df`` at one aggregation level."""
+        if isinstance(spec, str):
+            return pd.Index(df[spec].to_numpy())
+        return pd.MultiIndex.from_arrays([
+            np.floor(df["latitude"].to_numpy(dtype=np.float64) / spec).astype(np.int64),
+            np.floor(df["longitude"].to_numpy(dtype=np.float64) / spec).astype(np.int64),
+        ])
+
+    @staticmethod
+    def _labels(keys, spec):
+        if isinstance(spec, str):
+            return np.asarray(keys, dtype=str)
+        south = keys.get_level_values(0) * spec
+        west = keys.get_level_values(1) * spec
+        return np.array([f"{lat:.2f}, {lon:.2f}" for lat, lon in zip(south, west)], dtype=str)
+
+    def updated(self, old_df, new_df):
+        """A copy of this index over ``new_df``: ``old_df`` plus a delta.
+
+        Only changed and appended rows are binned again; bins first seen
+        in the delta get new codes after the existing ones, and bins left
+        empty simply drop out of ``bins``.
+        """
+        columns = ["latitude", "longitude"] + [
+            spec for spec in self.levels.values() if isinstance(spec, str)
+        ]
+        changed = np.unique(np.concatenate(
+            [changed_rows(old_df[col], new_df[col]) for col in columns]
+        ))
+        touched = np.concatenate([changed, np.arange(len(old_df), len(new_df))])
+        rows = new_df.take(touched)
+
+        index = GeoIndex.__new__(GeoIndex)
+        index.levels = self.levels
+        index._set_values(new_df)
+        index.codes = {}
+        index.keys = {}
+        index.labels = {}
+        for name, spec in self.levels.items():
+            keys = self._bin_keys(rows, spec)
+            unseen = keys[self.keys[name].get_indexer(keys) < 0].unique()
+            known = self.keys[name].append(unseen)
+
+            codes = np.empty(len(new_df), dtype=np.int32)
+            codes[:len(old_df)] = self.codes[name]
+            codes[touched] = known.get_indexer(keys)
+            index.codes[name] = codes
+            index.keys[name] = known
+            index.labels[name] = np.concatenate([self.labels[name], self._labels(unseen, spec)])
+        return index
+
+    @profiled("aggregate")
+    def bins(self, level, rows):
+        """Customer count, churn rate and summed charges per bin for ``rows``."""
+        codes = self.codes[level][rows]
+        labels = self.labels[level]
+        count = np.bincount(codes, minlength=len(labels))
+        keep = count > 0
+
+        def total(values):
+            return np.bincount(codes, weights=values[rows], minlength=len(labels))[keep]
+
+        customers = count[keep]
+        return pd.DataFrame({
+            "area": labels[keep],
+            "latitude": total(self.latitude) / customers,
+            "longitude": total(self.longitude) / customers,
+            "customers": customers,
+            "churn_rate": total(self.churn_value) / customers * 100,
+            "monthly_charges": total(self.monthly_charges),
+        })
+
+
+@st.cache_resource(max_entries=RETAINED_VERSIONS)
+def _geo_index_for_version(version):
+    delta = delta_for_version(version)
+    if delta is None:
+        index = GeoIndex(load_data(version))
+    else:
+        index = load_geo_index(delta.base).updated(load_data(delta.base), load_data(version))
+    return register_shared(f"geo index {version}", index)
+
+
+def load_geo_index(version=None):
+    """The geo index over a dataset version, built once per process."""
+    return _geo_index_for_version(version or dataset_version())
@@ -0,0 +1,99 @@
+import io
+from pathlib import Path
+
+import streamlit as st
+
+# ======================================================
+# IMAGE VARIANT SETTINGS
+# ======================================================
+BASE_PATH = Path(__file__).resolve().parent.parent
+IMAGE_PATH = BASE_PATH / "images"
+
+# Pre-encoded variants written by scripts/prepare_images.py.
+VARIANT_PATH = IMAGE_PATH / "variants"
+
+VARIANT_WIDTHS = (320, 640, 960, 1280, 1920)
+WEBP_QUALITY = 80
+
+# Variants are chosen for this many device pixels per CSS pixel, so
+# screenshots stay sharp on high-density screens.
+PIXEL_DENSITY = 1.5
+
+# Content width of a full-width element in the wide page layout.
+FULL_WIDTH = 1280
+
+
+# ======================================================
+# ENCODING
+# ======================================================
+def variant_widths(source_width):
+    """Variant widths for a source image; never upscaled."""
+    return [w for w in VARIANT_WIDTHS if w < source_width] + [source_width]
+
+
+def encode_variant(image, width):
+    """``image`` resized to ``width`` pixels wide, as WebP bytes."""
+    from PIL import Image
+
+    if width != image.width:
+        height = round(image.height * width / image.width)
+        image = image.resize((width, height), Image.LANCZOS)
+    buffer = io.BytesIO()
+    image.save(buffer, format="WEBP", quality=WEBP_QUALITY, method=6)
+    return buffer.getvalue()
+
+
+def variant_path(name, width):
+    return VARIANT_PATH / f"{Path(name).stem}-{width}.webp"
+
+
+def build_variants(name):
+    """Encode every variant of ``images/<name>``; returns {width: bytes}."""
+    from PIL import Image
+
+    with Image.open(IMAGE_PATH / name) as image:
+        image.load()
+        return {width: encode_variant(image, width) for width in variant_widths(image.width)}
+
+
+# ======================================================
+# CACHED VARIANTS
+# ======================================================
+def _source_version(name):
+    stat = (IMAGE_PATH / name).stat()
+    return f"{stat.st_size}-{stat.st_mtime_ns}"
+
+
+@st.cache_resource(max_entries=32, show_spinner=False)
+def _widths_for_version(name, version):
+    from PIL import Image
+
+    # Opening reads only the header; no pixels are decoded.
+    with Image.open(IMAGE_PATH / name) as image:
+        return variant_widths(image.width)
+
+
+@st.cache_resource(max_entries=64, show_spinner=False)
+def _variant_for_version(name, width, version):
+    source = IMAGE_PATH / name
+    prepared = variant_path(name, width)
+    if prepared.exists() and prepared.stat().st_mtime_ns >= source.stat().st_mtime_ns:
+        return prepared.read_bytes()
+
+    from PIL import Image
+
+    with Image.open(source) as image:
+        return encode_variant(image, width)
+
+
+def image_for(name, display_width=FULL_WIDTH):
+    """Bytes of the smallest variant that covers ``display_width`` CSS pixels.
+
+    Each variant is encoded once per process, on first use, unless
+    scripts/prepare_images.py has written a copy newer than the source.
+    """
+    version = _source_version(name)
+    widths = _widths_for_version(name, version)
+    needed = display_width * PIXEL_DENSITY
+    width = min((w for w in widths if w >= needed), default=max(widths))
+    return _variant_for_version(name, width, version)
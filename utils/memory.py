@@ -0,0 +1,267 @@
+import json
+import os
+import sys
+import threading
+import time
+import weakref
+from collections import deque
+from types import FunctionType, MethodType, ModuleType
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from utils.profiler import current_profile
+
+# ======================================================
+# MEMORY ACCOUNTING SETTINGS
+# ======================================================
+# Optional JSON file rewritten with the latest snapshot on every profiled rerun.
+MEMORY_REPORT_PATH = os.environ.get("CHURN_MEMORY_REPORT")
+
+# Sessions not seen for this long drop out of the ledger.
+SESSION_TTL_SECONDS = 30 * 60
+
+TOP_CONSUMERS = 10
+
+
+# ======================================================
+# DEEP SIZES
+# ======================================================
+def deep_size(obj, seen=None):
+    """Approximate bytes held by ``obj`` and everything it references.
+
+    Objects whose id is in ``seen`` are not counted again, so structures
+    that point back at the shared dataset do not count it twice.
+    """
+    seen = set() if seen is None else seen
+    if id(obj) in seen:
+        return 0
+    seen.add(id(obj))
+    return _own_size(obj, seen)
+
+
+def _own_size(obj, seen):
+    if isinstance(obj, pd.DataFrame):
+        return int(obj.memory_usage(deep=True).sum())
+    if isinstance(obj, (pd.Series, pd.Index)):
+        return int(obj.memory_usage(deep=True))
+    if isinstance(obj, np.ndarray):
+        return obj.nbytes
+    if isinstance(obj, (str, bytes, int, float, bool)) or obj is None:
+        return sys.getsizeof(obj)
+    if isinstance(obj, (ModuleType, type, FunctionType, MethodType)):
+        return 0
+    if hasattr(obj, "estimated_size"):
+        # Polars frames
+        return int(obj.estimated_size())
+    if isinstance(getattr(obj, "nbytes", None), int):
+        # Arrow tables and anything else that reports its own size
+        return obj.nbytes
+    if isinstance(obj, dict):
+        return sys.getsizeof(obj) + sum(
+            deep_size(key, seen) + deep_size(value, seen) for key, value in obj.items()
+        )
+    if isinstance(obj, (list, tuple, set, frozenset, deque)):
+        return sys.getsizeof(obj) + sum(deep_size(item, seen) for item in obj)
+    if hasattr(obj, "__dict__"):
+        return sys.getsizeof(obj) + deep_size(vars(obj), seen)
+    return sys.getsizeof(obj)
+
+
+# ======================================================
+# SHARED (PER-PROCESS) CONSUMERS
+# ======================================================
+_shared = weakref.WeakValueDictionary()
+_uncounted = set()
+_shared_lock = threading.Lock()
+
+
+def register_shared(name, obj, counted=True):
+    """Record a process-wide cached object for memory accounting.
+
+    Returns ``obj`` so loaders can ``return register_shared(...)``.
+    Version-keyed loaders include the dataset version in ``name``, so
+    every retained version is accounted for, not just the latest. Pass
+    ``counted=False`` for objects that only view memory owned by another
+    registered object; they are still recognised as shared. The registry
+    holds weak references and never keeps an evicted object alive.
+    """
+    with _shared_lock:
+        _shared[name] = obj
+        if counted:
+            _uncounted.discard(name)
+        else:
+            _uncounted.add(name)
+    return obj
+
+
+def is_shared(obj):
+    """Whether ``obj`` is a registered object or held by a registered cache.
+
+    Caches expose ``owns(obj)`` for the entries they hand out.
+    """
+    with _shared_lock:
+        values = list(_shared.values())
+    return any(value is obj or _owns(value, obj) for value in values)
+
+
+def _owns(container, obj):
+    owns = getattr(container, "owns", None)
+    return callable(owns) and owns(obj)
+
+
+def shared_sizes():
+    """Bytes held by each registered shared object."""
+    with _shared_lock:
+        items = list(_shared.items())
+        uncounted = set(_uncounted)
+
+    seen = {id(obj) for _, obj in items}
+    return {
+        name: _own_size(obj, seen)
+        for name, obj in items
+        if name not in uncounted
+    }
+
+
+# ======================================================
+# PER-SESSION CONSUMERS
+# ======================================================
+def track_frame(name, frame):
+    """Account ``frame`` to the current session's rerun when profiling.
+
+    Shared frames, such as the dataset itself (an unfiltered view) or a
+    cached partition read, are not charged to the session and are skipped.
+    """
+    profile = current_profile()
+    if profile is None or is_shared(frame):
+        return
+    profile.frames[name] = deep_size(frame)
+
+
+def track_figure(chart, payload):
+    """Account a serialised figure ``payload`` to the current session's rerun."""
+    profile = current_profile()
+    if profile is not None:
+        profile.figures[chart] = len(payload.encode("utf-8"))
+
+
+class SessionLedger:
+    """Frames and figure payloads of each session's latest profiled rerun."""
+
+    def __init__(self, ttl=SESSION_TTL_SECONDS):
+        self.ttl = ttl
+        self.sessions = {}
+        self._lock = threading.Lock()
+
+    def record(self, profile):
+        now = time.time()
+        with self._lock:
+            self.sessions[profile.session] = {
+                "page": profile.page,
+                "updated_at": now,
+                "frames": dict(profile.frames),
+                "figures": dict(profile.figures),
+            }
+            for session, entry in list(self.sessions.items()):
+                if now - entry["updated_at"] > self.ttl:
+                    del self.sessions[session]
+
+    def snapshot(self):
+        with self._lock:
+            return {session: dict(entry) for session, entry in self.sessions.items()}
+
+
+@st.cache_resource
+def load_session_ledger():
+    """One session ledger per process."""
+    return SessionLedger()
+
+
+# ======================================================
+# SNAPSHOT
+# ======================================================
+def rss_bytes():
+    """Current resident set size, where /proc is available."""
+    try:
+        with open("/proc/self/statm") as handle:
+            return int(handle.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        return None
+
+
+def memory_snapshot():
+    """Totals and top consumers across shared caches and sessions."""
+    shared = shared_sizes()
+    sessions = load_session_ledger().snapshot()
+
+    consumers = [
+        {"owner": "shared", "consumer": name, "bytes": size}
+        for name, size in shared.items()
+    ]
+    for session, entry in sessions.items():
+        entry["bytes"] = sum(entry["frames"].values()) + sum(entry["figures"].values())
+        consumers += [
+            {"owner": f"session {session}", "consumer": name, "bytes": size}
+            for name, size in entry["frames"].items()
+        ]
+        consumers += [
+            {"owner": f"session {session}", "consumer": f"figure {chart}", "bytes": size}
+            for chart, size in entry["figures"].items()
+        ]
+
+    shared_total = sum(shared.values())
+    session_total = sum(entry["bytes"] for entry in sessions.values())
+    return {
+        "created_at": time.time(),
+        "rss_bytes": rss_bytes(),
+        "totals": {
+            "shared": shared_total,
+            "sessions": session_total,
+            "tracked": shared_total + session_total,
+        },
+        "shared": shared,
+        "sessions": sessions,
+        "top": sorted(consumers, key=lambda c: c["bytes"], reverse=True)[:TOP_CONSUMERS],
+    }
+
+
+def write_memory_report(snapshot, path=MEMORY_REPORT_PATH):
+    if not path:
+        return
+    partial = f"{path}.partial"
+    with open(partial, "w", encoding="utf-8") as handle:
+        json.dump(snapshot, handle, indent=2)
+    os.replace(partial, path)
+
+
+# ======================================================
+# PERFORMANCE PANEL SECTION
+# ======================================================
+def render_memory_section(profile):
+    """Record ``profile`` in the ledger and show memory totals and top consumers."""
+    load_session_ledger().record(profile)
+    snapshot = memory_snapshot()
+    write_memory_report(snapshot)
+
+    totals = snapshot["totals"]
+    rss = snapshot["rss_bytes"]
+    st.markdown("**Memory**")
+    st.caption(
+        f"Shared: {totals['shared'] / 2**20:,.1f} MB · "
+        f"Sessions ({len(snapshot['sessions'])}): {totals['sessions'] / 2**20:,.1f} MB"
+        + (f" · RSS: {rss / 2**20:,.0f} MB" if rss else "")
+    )
+
+    top = pd.DataFrame(snapshot["top"])
+    if not top.empty:
+        top["MB"] = (top.pop("bytes") / 2**20).round(2)
+        st.dataframe(top, hide_index=True, use_container_width=True)
+
+    st.download_button(
+        "Export memory snapshot (JSON)",
+        data=json.dumps(snapshot, indent=2),
+        file_name="memory_snapshot.json",
+        mime="application/json"
+    )
@@ -0,0 +1,120 @@
+import shutil
+from pathlib import Path
+
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
+
+from utils.schema import apply_schema
+
+# ======================================================
+# PARTITIONED PARQUET STORE
+# ======================================================
+# Directory levels of the store, outermost first (state=.../contract=...).
+PARTITION_COLUMNS = ("state",)
+
+# Rows are sorted by this column inside every partition, so the min/max
+# statistics of each row group cover a narrow tenure band and a tenure
+# filter skips most row groups.
+SORT_COLUMN = "tenure_in_months"
+
+ROW_GROUP_SIZE = 64 * 1024
+
+# Text file in the store root recording which CSV revision it was built from.
+SOURCE_VERSION_FILE = "_source_version"
+
+
+def write_partitioned(df, path, source_version, partition_by=PARTITION_COLUMNS,
+                      row_group_size=ROW_GROUP_SIZE):
+    """Write ``df`` as a hive-partitioned Parquet dataset with statistics.
+
+    The store is written next to ``path`` and renamed into place, so a
+    reader never sees a partially written store.
+    """
+    path = Path(path)
+    staging = path.with_name(f"{path.name}.partial")
+    if staging.exists():
+        shutil.rmtree(staging)
+
+    table = pa.Table.from_pandas(df.sort_values(SORT_COLUMN, kind="stable"), preserve_index=False)
+    ds.write_dataset(
+        table,
+        str(staging),
+        format="parquet",
+        partitioning=list(partition_by),
+        partitioning_flavor="hive",
+        max_rows_per_group=row_group_size,
+        min_rows_per_group=min(row_group_size, 1024)
+    )
+    (staging / SOURCE_VERSION_FILE).write_text(source_version, encoding="utf-8")
+
+    if path.exists():
+        shutil.rmtree(path)
+    staging.rename(path)
+
+
+def partitioned_source_version(path):
+    """Source CSV version recorded in the store at ``path``, or None if absent."""
+    version_file = Path(path) / SOURCE_VERSION_FILE
+    if not version_file.exists():
+        return None
+    return version_file.read_text(encoding="utf-8").strip()
+
+
+def open_partitioned(path):
+    """The store at ``path`` as a pyarrow dataset; nothing is read yet."""
+    return ds.dataset(str(path), format="parquet", partitioning="hive")
+
+
+def filter_expression(selections, tenure_range=None):
+    """pyarrow filter for a filter state, or None when nothing is filtered.
+
+    Conditions on partition columns prune whole directories; the others
+    are checked against row-group statistics before any rows are decoded.
+    A filter with nothing selected matches no rows.
+    """
+    if any(len(values) == 0 for values in selections.values()):
+        return pc.scalar(False)
+    conditions = [ds.field(col).isin(list(values)) for col, values in selections.items()]
+    if tenure_range is not None:
+        low, high = tenure_range
+        conditions.append((ds.field(SORT_COLUMN) >= low) & (ds.field(SORT_COLUMN) <= high))
+
+    expression = None
+    for condition in conditions:
+        expression = condition if expression is None else expression & condition
+    return expression
+
+
+def read_partitioned(dataset, selections, tenure_range=None, columns=None):
+    """Rows of ``dataset`` matching the filter state, only ``columns``."""
+    table = dataset.to_table(columns=columns, filter=filter_expression(selections, tenure_range))
+    return apply_schema(table.to_pandas(split_blocks=True))
+
+
+def scanned_bytes(dataset, selections, tenure_range=None, columns=None):
+    """(scanned, total) compressed bytes for a read of the filter state.
+
+    ``scanned`` counts the chunks of ``columns`` and of the filtered
+    columns in the row groups left after partition pruning and
+    statistics; ``total`` is the size of the whole store.
+    """
+    total = sum(Path(path).stat().st_size for path in dataset.files)
+    if any(len(values) == 0 for values in selections.values()):
+        return 0, total
+    expression = filter_expression(selections, tenure_range)
+    if columns is not None:
+        columns = set(columns) | set(selections)
+        if tenure_range is not None:
+            columns.add(SORT_COLUMN)
+    scanned = 0
+    for fragment in dataset.get_fragments(filter=expression):
+        for row_group in fragment.split_by_row_group(filter=expression, schema=dataset.schema):
+            metadata = row_group.metadata
+            for index in (g.id for g in row_group.row_groups):
+                group = metadata.row_group(index)
+                for i in range(group.num_columns):
+                    chunk = group.column(i)
+                    if columns is None or chunk.path_in_schema in columns:
+                        scanned += chunk.total_compressed_size
+    return scanned, total
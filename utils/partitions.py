@@ -0,0 +1,143 @@
+import os
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import streamlit as st
+
+from utils.data_loader import (
+    PARQUET_PATH,
+    RETAINED_VERSIONS,
+    dataset_version,
+    freeze,
+    parquet_is_current
+)
+from utils.memory import register_shared
+from utils.parquet_store import open_partitioned, read_partitioned, scanned_bytes
+from utils.profiler import current_profile, track_read
+
+# ======================================================
+# PARTITIONED READ SETTINGS
+# ======================================================
+# Set CHURN_PARTITIONED_READS=1 to serve pages 1 and 4 from the partitioned
+# Parquet store instead of the shared in-memory dataset, for extracts too
+# large to keep in every server process. Used only while the store was
+# built from the served CSV revision; otherwise pages use the shared frame.
+PARTITIONED_READS = os.environ.get("CHURN_PARTITIONED_READS", "").lower() in ("1", "true", "yes")
+
+# Filter states whose partition read is kept, shared across pages and sessions.
+PARTITION_CACHE_ENTRIES = int(os.environ.get("CHURN_PARTITION_CACHE_ENTRIES", "16"))
+
+
+def partitioned_reads():
+    """Whether this run reads its rows from the partitioned store."""
+    return PARTITIONED_READS and parquet_is_current(dataset_version())
+
+
+# ======================================================
+# CACHED PARTITION READS
+# ======================================================
+class PartitionRead:
+    """Rows of one filter state read from the store, and objects built on them."""
+
+    def __init__(self, frame, scan):
+        self.frame = freeze(frame)
+        self.rows = np.arange(len(frame))
+        self.rows.setflags(write=False)
+        self._scan = scan
+        self._derived = {}
+        self._lock = threading.Lock()
+
+    def derived(self, name, build):
+        """``build(frame)``, computed once per read."""
+        with self._lock:
+            if name not in self._derived:
+                self._derived[name] = build(self.frame)
+            return self._derived[name]
+
+    def scanned_bytes(self):
+        """(scanned, total) stored bytes of the read, worked out on first call."""
+        return self.derived("scanned bytes", lambda frame: self._scan())
+
+
+class PartitionReadCache:
+    """Partition reads keyed by version and filter state, evicted least-recently-used."""
+
+    def __init__(self, max_entries=PARTITION_CACHE_ENTRIES):
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, build):
+        with self._lock:
+            read = self.entries.get(key)
+            if read is not None:
+                self.entries.move_to_end(key)
+                return read
+
+        read = build()
+        with self._lock:
+            self.entries[key] = read
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+        return read
+
+    def owns(self, frame):
+        """Whether ``frame`` is one of the cached reads (see ``utils.memory``)."""
+        with self._lock:
+            return any(read.frame is frame for read in self.entries.values())
+
+
+@st.cache_resource
+def load_partition_cache():
+    """One partition-read cache per process, shared by every page and session."""
+    return register_shared("partition reads", PartitionReadCache())
+
+
+@st.cache_resource(max_entries=RETAINED_VERSIONS)
+def _store_for_version(version):
+    return open_partitioned(PARQUET_PATH)
+
+
+def _read(version, key, tenure_range, columns):
+    store = _store_for_version(version)
+    selections = {col: list(values) for col, values in key}
+    columns = list(columns) if columns is not None else None
+    return PartitionRead(
+        read_partitioned(store, selections, tenure_range, columns),
+        lambda: scanned_bytes(store, selections, tenure_range, columns)
+    )
+
+
+def read_partitions(selections, tenure_range=None, columns=None, version=None):
+    """The cached ``PartitionRead`` of a filter state on a dataset version.
+
+    Only the partitions and row groups that can hold matching rows are
+    opened, and only ``columns`` (default all) are decoded.
+    """
+    version = version or dataset_version()
+    key = tuple(sorted((col, tuple(sorted(values, key=str))) for col, values in selections.items()))
+    tenure_range = tuple(tenure_range) if tenure_range is not None else None
+    columns = tuple(columns) if columns is not None else None
+    read = load_partition_cache().get(
+        (version, key, tenure_range, columns),
+        lambda: _read(version, key, tenure_range, columns)
+    )
+    if current_profile() is not None:
+        # Walks the row-group metadata, so only for the performance panel.
+        track_read(len(read.frame.columns), *read.scanned_bytes())
+    return read
+
+
+def select_partitions(selections, tenure_range=None, columns=None):
+    """Partition-read counterpart of ``filtered_rows``: (rows, frame).
+
+    ``rows`` index into ``frame``; pass it as ``df`` to the aggregates.
+    """
+    read = read_partitions(selections, tenure_range, columns)
+    return read.rows, read.frame
+
+
+def load_filter_columns(columns):
+    """``columns`` of every customer, for the sidebar options and ranges."""
+    return read_partitions({}, columns=columns).frame
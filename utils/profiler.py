@@ -0,0 +1,264 @@
+import functools
+import json
+import os
+import threading
+import time
+import uuid
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+import pandas as pd
+import streamlit as st
+
+# ======================================================
+# PROFILER SETTINGS
+# ======================================================
+# Set CHURN_PROFILE=1 (or open a page with ?profile=1) to record timings.
+PROFILE_ENV_ENABLED = os.environ.get("CHURN_PROFILE", "").lower() in ("1", "true", "yes")
+
+# Reruns kept in memory per process, across all pages and sessions.
+PROFILE_BUFFER_SIZE = int(os.environ.get("CHURN_PROFILE_BUFFER", "500"))
+
+# Optional JSON-lines file every recorded rerun is appended to.
+PROFILE_LOG_PATH = os.environ.get("CHURN_PROFILE_LOG")
+
+# Hot-path stages, in page order. Time outside them is reported as "other".
+STAGES = ["load", "filter", "aggregate", "figure", "serialise"]
+
+PANEL_RERUNS = 10
+
+_current = ContextVar("churn_rerun_profile", default=None)
+
+
+# ======================================================
+# PER-RERUN PROFILE
+# ======================================================
+class RerunProfile:
+    """Stage timings of one script run.
+
+    Stages nest: a stage's time excludes the stages opened inside it, so
+    an aggregation run inside a figure build counts once, as "aggregate".
+    """
+
+    def __init__(self, page, session):
+        self.page = page
+        self.session = session
+        self.started_at = time.time()
+        self._started = time.perf_counter()
+        self.total = None
+        self.stages = dict.fromkeys(STAGES, 0.0)
+        self.charts = {}
+        self.frames = {}
+        self.figures = {}
+        self.reads = []
+        self._stack = []
+        self._figure_charts = {}
+
+    def open(self, stage, chart):
+        if chart is None and self._stack:
+            chart = self._stack[-1][1]
+        self._stack.append([stage, chart, time.perf_counter(), 0.0])
+
+    def close(self):
+        stage, chart, started, nested = self._stack.pop()
+        elapsed = time.perf_counter() - started
+        if self._stack:
+            self._stack[-1][3] += elapsed
+
+        own = elapsed - nested
+        self.stages[stage] = self.stages.get(stage, 0.0) + own
+        if chart is not None:
+            timings = self.charts.setdefault(chart, {})
+            timings[stage] = timings.get(stage, 0.0) + own
+
+    def label_figure(self, fig, chart):
+        self._figure_charts[id(fig)] = chart
+
+    def figure_chart(self, fig):
+        return self._figure_charts.get(id(fig))
+
+    def finish(self):
+        self.total = time.perf_counter() - self._started
+
+    def as_record(self):
+        return {
+            "page": self.page,
+            "session": self.session,
+            "started_at": self.started_at,
+            "total_ms": self.total * 1000,
+            "stages_ms": {stage: seconds * 1000 for stage, seconds in self.stages.items()},
+            "other_ms": (self.total - sum(self.stages.values())) * 1000,
+            "charts_ms": {
+                chart: {stage: seconds * 1000 for stage, seconds in timings.items()}
+                for chart, timings in self.charts.items()
+            },
+            "reads": list(self.reads),
+        }
+
+
+# ======================================================
+# RING BUFFER
+# ======================================================
+class ProfileBuffer:
+    """The most recent rerun records of this process."""
+
+    def __init__(self, maxlen=PROFILE_BUFFER_SIZE, log_path=PROFILE_LOG_PATH):
+        self.records = deque(maxlen=maxlen)
+        self.log_path = log_path
+        self._lock = threading.Lock()
+
+    def append(self, record):
+        with self._lock:
+            self.records.append(record)
+            if self.log_path:
+                with open(self.log_path, "a", encoding="utf-8") as handle:
+                    handle.write(json.dumps(record) + "\n")
+
+    def recent(self, page=None, limit=None):
+        with self._lock:
+            records = [r for r in self.records if page is None or r["page"] == page]
+        return records[-limit:] if limit else records
+
+    def to_jsonl(self):
+        return "".join(json.dumps(record) + "\n" for record in self.recent())
+
+
+@st.cache_resource
+def load_profile_buffer():
+    """One rerun ring buffer per process, shared by every page and session."""
+    return ProfileBuffer()
+
+
+# ======================================================
+# INSTRUMENTATION
+# ======================================================
+def profiling_enabled():
+    if PROFILE_ENV_ENABLED:
+        return True
+    return st.query_params.get("profile", "").lower() in ("1", "true", "yes")
+
+
+def current_profile():
+    """The profile of the rerun in progress on this thread, or None."""
+    return _current.get()
+
+
+def start_rerun(page):
+    """Begin timing this run of ``page`` when profiling is enabled."""
+    profile = None
+    if profiling_enabled():
+        session = st.session_state.setdefault("_profile_session", uuid.uuid4().hex[:8])
+        profile = RerunProfile(page, session)
+    _current.set(profile)
+
+
+@contextmanager
+def timed(stage, chart=None):
+    """Attribute the enclosed block to ``stage`` (and ``chart``) of this rerun."""
+    profile = _current.get()
+    if profile is None:
+        yield
+        return
+    profile.open(stage, chart)
+    try:
+        yield
+    finally:
+        profile.close()
+
+
+def profiled(stage):
+    """Decorator form of ``timed``."""
+    def decorate(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if _current.get() is None:
+                return func(*args, **kwargs)
+            with timed(stage):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+def label_figure(fig, chart):
+    """Remember which chart ``fig`` is, for its serialisation timing."""
+    profile = _current.get()
+    if profile is not None:
+        profile.label_figure(fig, chart)
+
+
+def track_read(columns, scanned, total):
+    """Record that this rerun read ``scanned`` of the ``total`` stored bytes."""
+    profile = _current.get()
+    if profile is not None:
+        profile.reads.append({"columns": columns, "scanned_bytes": scanned, "total_bytes": total})
+
+
+def plotly_chart(fig, **kwargs):
+    """``st.plotly_chart`` with its serialisation timed."""
+    profile = _current.get()
+    chart = profile.figure_chart(fig) if profile is not None else None
+    with timed("serialise", chart):
+        return st.plotly_chart(fig, **kwargs)
+
+
+# ======================================================
+# PERFORMANCE PANEL
+# ======================================================
+def render_performance_panel():
+    """Record this rerun and show recent timings in the sidebar.
+
+    Call once, at the end of the page. Does nothing unless profiling is
+    enabled.
+    """
+    profile = _current.get()
+    _current.set(None)
+    if profile is None:
+        return
+
+    profile.finish()
+    buffer = load_profile_buffer()
+    buffer.append(profile.as_record())
+    recent = buffer.recent(page=profile.page, limit=PANEL_RERUNS)
+
+    with st.sidebar.expander("⏱️ Performance", expanded=True):
+        latest = recent[-1]
+        st.caption(
+            f"Last rerun: {latest['total_ms']:,.0f} ms · "
+            f"{len(recent)} of {len(buffer.recent())} buffered reruns shown"
+        )
+
+        breakdown = pd.DataFrame(
+            [{**r["stages_ms"], "other": r["other_ms"]} for r in recent],
+            index=pd.RangeIndex(-len(recent) + 1, 1, name="rerun")
+        )
+        st.bar_chart(breakdown, height=180)
+
+        charts = pd.DataFrame.from_dict(latest["charts_ms"], orient="index")
+        if not charts.empty:
+            charts = charts.reindex(columns=STAGES).fillna(0.0)
+            charts["total"] = charts.sum(axis=1)
+            st.dataframe(
+                charts.sort_values("total", ascending=False).round(1),
+                use_container_width=True
+            )
+
+        for read in latest["reads"]:
+            share = read["scanned_bytes"] / read["total_bytes"] if read["total_bytes"] else 0.0
+            st.caption(
+                f"Store read: {read['scanned_bytes'] / 2**20:,.2f} of "
+                f"{read['total_bytes'] / 2**20:,.2f} MB ({share:.0%}) · "
+                f"{read['columns']} columns"
+            )
+
+        st.download_button(
+            "Export reruns (JSON lines)",
+            data=buffer.to_jsonl(),
+            file_name="rerun_profile.jsonl",
+            mime="application/x-ndjson"
+        )
+
+        # Imported here because utils.memory builds on this module.
+        from utils.memory import render_memory_section
+
+        render_memory_section(profile)
@@ -0,0 +1,197 @@
+import logging
+import os
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from utils.data_loader import RETAINED_VERSIONS, dataset_version
+from utils.features import load_enriched_data
+from utils.filter_index import select_columns
+from utils.memory import register_shared
+from utils.profiler import profiled
+
+logger = logging.getLogger(__name__)
+
+# ======================================================
+# ENGINE SELECTION
+# ======================================================
+# "pandas" (default), "polars" or "duckdb". Polars and DuckDB are optional
+# dependencies; if the configured one is not installed, pandas is used.
+QUERY_ENGINE = os.environ.get("CHURN_QUERY_ENGINE", "pandas").lower()
+
+AGGREGATIONS = ("count", "sum", "mean", "min", "max")
+
+
+# ======================================================
+# ENGINES
+# ======================================================
+class PandasEngine:
+    """Baseline engine: pandas group-bys over the shared frame."""
+
+    name = "pandas"
+
+    def __init__(self, df):
+        self.df = df
+        self.dtypes = df.dtypes
+
+    def aggregate(self, rows, by, aggs, where=None, order_by=None,
+                  descending=False, limit=None):
+        columns = [by] if isinstance(by, str) else list(by)
+        columns += [col for col, _ in aggs.values()] + list(where or {})
+        df = select_columns(self.df, rows, list(dict.fromkeys(columns)))
+        for col, values in (where or {}).items():
+            df = df[df[col].isin(values)]
+
+        named = {name: pd.NamedAgg(column=col, aggfunc=func) for name, (col, func) in aggs.items()}
+        result = df.groupby(by, observed=True).agg(**named).reset_index()
+        return _finish(result, by, self.dtypes, order_by, descending, limit)
+
+
+class PolarsEngine:
+    """Multithreaded columnar engine backed by a Polars copy of the dataset."""
+
+    name = "polars"
+
+    def __init__(self, df):
+        import polars as pl
+
+        self.pl = pl
+        self.frame = pl.from_pandas(df)
+        self.dtypes = df.dtypes
+
+    def aggregate(self, rows, by, aggs, where=None, order_by=None,
+                  descending=False, limit=None):
+        pl = self.pl
+        frame = self.frame
+        if len(rows) != frame.height:
+            frame = frame[rows]
+        for col, values in (where or {}).items():
+            frame = frame.filter(pl.col(col).cast(pl.Utf8).is_in([str(v) for v in values]))
+
+        exprs = []
+        for name, (col, func) in aggs.items():
+            expr = pl.col(col).count().cast(pl.Int64) if func == "count" else getattr(pl.col(col), func)()
+            exprs.append(expr.alias(name))
+
+        result = frame.group_by(by).agg(exprs).to_pandas()
+        return _finish(result, by, self.dtypes, order_by, descending, limit)
+
+
+class DuckDBEngine:
+    """Embedded DuckDB over an Arrow view of the shared dataset."""
+
+    name = "duckdb"
+
+    def __init__(self, df):
+        import duckdb
+        import pyarrow as pa
+
+        self.pa = pa
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        self.table = table.append_column("row_id", pa.array(np.arange(len(df), dtype=np.int64)))
+        self.n_rows = len(df)
+        self.dtypes = df.dtypes
+        self.connection = duckdb.connect()
+
+    def aggregate(self, rows, by, aggs, where=None, order_by=None,
+                  descending=False, limit=None):
+        by = [by] if isinstance(by, str) else list(by)
+        # One cursor per query keeps concurrent sessions independent;
+        # registered Arrow views are per cursor and zero-copy.
+        cursor = self.connection.cursor()
+        cursor.register("customers", self.table)
+
+        clauses = []
+        params = []
+        if len(rows) != self.n_rows:
+            cursor.register("selected", self.pa.table({"row_id": np.asarray(rows, dtype=np.int64)}))
+            clauses.append("row_id IN (SELECT row_id FROM selected)")
+        for col, values in (where or {}).items():
+            if not values:
+                clauses.append("FALSE")
+                continue
+            clauses.append(f'CAST("{col}" AS VARCHAR) IN ({", ".join("?" for _ in values)})')
+            params += [str(v) for v in values]
+
+        select = [f'"{col}"' for col in by] + [
+            f'{func.upper()}("{col}") AS "{name}"' if func != "mean"
+            else f'AVG("{col}") AS "{name}"'
+            for name, (col, func) in aggs.items()
+        ]
+        sql = f"SELECT {', '.join(select)} FROM customers"
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        sql += " GROUP BY " + ", ".join(f'"{col}"' for col in by)
+
+        result = cursor.execute(sql, params).df()
+        cursor.close()
+        return _finish(result, by, self.dtypes, order_by, descending, limit)
+
+
+ENGINES = {
+    "pandas": PandasEngine,
+    "polars": PolarsEngine,
+    "duckdb": DuckDBEngine,
+}
+
+
+def _finish(result, by, dtypes, order_by, descending, limit):
+    # Group keys come back in each engine's own types (Polars keeps its
+    # own category order, which pandas still calls an equal dtype); re-code
+    # them to the shared frame's dtypes so every engine sorts and returns
+    # groups the same way.
+    for col in [by] if isinstance(by, str) else by:
+        dtype = dtypes[col]
+        if isinstance(dtype, pd.CategoricalDtype):
+            result[col] = pd.Categorical(result[col], dtype=dtype)
+        elif result[col].dtype != dtype:
+            result[col] = result[col].astype(dtype)
+    if order_by is None:
+        result = result.sort_values(by=by)
+    else:
+        result = result.sort_values(by=order_by, ascending=not descending)
+    if limit is not None:
+        result = result.head(limit)
+    return result.reset_index(drop=True)
+
+
+@st.cache_resource(max_entries=RETAINED_VERSIONS)
+def _query_engine_for_version(version, name):
+    engine = ENGINES.get(name)
+    if engine is None:
+        raise ValueError(f"Unknown query engine {name!r}; expected one of {sorted(ENGINES)}")
+    try:
+        instance = engine(load_enriched_data(version))
+    except ImportError:
+        logger.warning("Query engine %r is not installed; falling back to pandas.", name)
+        instance = PandasEngine(load_enriched_data(version))
+    return register_shared(f"query engine {name} {version}", instance)
+
+
+def load_query_engine(name=QUERY_ENGINE, version=None):
+    """The configured engine over a dataset version, built once per process."""
+    return _query_engine_for_version(version or dataset_version(), name)
+
+
+# ======================================================
+# QUERY API
+# ======================================================
+@profiled("aggregate")
+def aggregate(rows, by, aggs, where=None, order_by=None, descending=False, limit=None,
+              df=None):
+    """Group the selected rows and aggregate them with the configured engine.
+
+    ``rows`` are row positions from the filter index, ``by`` a column or
+    list of columns, and ``aggs`` maps output names to ``(column, func)``
+    with ``func`` one of ``AGGREGATIONS``. ``where`` adds equality filters
+    (column -> allowed values). Results are pandas DataFrames whatever the
+    engine, sorted by ``order_by`` (or the group keys) and cut to ``limit``.
+    Pass ``df`` when ``rows`` index into another frame than the shared
+    dataset, such as a partition read; it is aggregated with pandas.
+    """
+    for name, (_, func) in aggs.items():
+        if func not in AGGREGATIONS:
+            raise ValueError(f"Unsupported aggregation {func!r} for {name!r}")
+    engine = load_query_engine() if df is None else PandasEngine(df)
+    return engine.aggregate(rows, by, aggs, where, order_by, descending, limit)
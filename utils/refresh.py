@@ -0,0 +1,179 @@
+import logging
+import os
+import threading
+import time
+from pathlib import Path
+
+import streamlit as st
+
+from utils.cube import load_cube
+from utils.data_loader import (
+    DATA_PATH,
+    DELTA_PATH,
+    content_version,
+    file_signature,
+    load_data,
+    load_dataset_versions,
+    load_delta_registry,
+    pin_dataset_version
+)
+from utils.features import load_enriched_data
+from utils.filter_index import load_filter_index
+from utils.geo import load_geo_index
+from utils.query import load_query_engine
+from utils.warmup import BACKGROUND_THREAD_PREFIX, quiet_background_threads
+
+logger = logging.getLogger(__name__)
+
+# ======================================================
+# REFRESH SETTINGS
+# ======================================================
+# Seconds between checks of the data file and the delta directory;
+# CHURN_REFRESH_INTERVAL=0 turns the background refresh off.
+REFRESH_INTERVAL = float(os.environ.get("CHURN_REFRESH_INTERVAL", "30"))
+
+REFRESH_THREAD_NAME = f"{BACKGROUND_THREAD_PREFIX}refresh"
+
+# Shared objects built for a new version before it is published, in
+# dependency order.
+VERSION_BUILDERS = [
+    ("dataset", load_data),
+    ("derived tiers", load_enriched_data),
+    ("filter index", load_filter_index),
+    ("aggregate cube", load_cube),
+    ("geo index", load_geo_index),
+    ("query engine", lambda version: load_query_engine(version=version)),
+]
+
+
+# ======================================================
+# BACKGROUND REFRESHER
+# ======================================================
+class DatasetRefresher:
+    """Watches the data file and swaps in each new version once built.
+
+    A changed size or modification time triggers a content hash; only a
+    new hash is rebuilt. Sessions keep reading the previous version while
+    the new one is built, and figure, selection and aggregate caches keyed
+    on the old version age out of their LRUs afterwards.
+
+    Delta files dropped into ``delta_path`` are applied in name order on
+    top of the served version. The filter index, cube and geo index of a
+    delta version are updated from those of its base; tiers and the query
+    engine are rebuilt. A new full extract replaces the data file and
+    supersedes every delta applied before it.
+    """
+
+    def __init__(self, versions, path=DATA_PATH, delta_path=DELTA_PATH,
+                 interval=REFRESH_INTERVAL):
+        self.versions = versions
+        self.path = path
+        self.delta_path = Path(delta_path)
+        self.interval = interval
+        # (name, signature) of every delta file seen, applied or failed.
+        self.seen_deltas = set()
+        self.last_checked = None
+        self.last_swap = None
+        self.building = None
+        self.error = None
+        self._lock = threading.Lock()
+
+    def check(self):
+        """Publish a changed data file, then new deltas; True on a swap."""
+        with self._lock:
+            self.last_checked = time.time()
+            swapped = self._check_file()
+            return self._check_deltas() or swapped
+
+    def _check_file(self):
+        signature = file_signature(self.path)
+        if signature == self.versions.signature:
+            return False
+
+        version = content_version(self.path)
+        swapped = version != self.versions.current
+        if swapped:
+            self.build(version)
+        self.publish(version, signature)
+        if swapped:
+            self.last_swap = time.time()
+            logger.info("Now serving dataset version %s", version)
+        return swapped
+
+    def _check_deltas(self):
+        swapped = False
+        for path in sorted(self.delta_path.glob("*.csv")):
+            seen = (path.name, file_signature(path))
+            if seen in self.seen_deltas:
+                continue
+            # Marked before ingesting so a broken file is not retried on
+            # every check; rewriting it changes its signature.
+            self.seen_deltas.add(seen)
+            self.ingest(path)
+            swapped = True
+        return swapped
+
+    def ingest(self, path):
+        """Apply one delta file on top of the served version and publish it."""
+        delta = load_delta_registry().register(self.versions.current, path)
+        self.build(delta.version)
+        self.publish(delta.version, self.versions.signature)
+        self.last_swap = time.time()
+        logger.info(
+            "Applied %s (%d customers); now serving dataset version %s",
+            path.name, len(delta.frame), delta.version
+        )
+
+    def publish(self, version, signature):
+        self.versions.publish(version, signature)
+        # A delta is rebuilt from its base; once the base has aged out of
+        # the loaders' caches the delta's changed rows are not needed.
+        load_delta_registry().prune(self.versions.retained())
+
+    def build(self, version):
+        self.building = version
+        try:
+            for step, build in VERSION_BUILDERS:
+                started = time.perf_counter()
+                build(version)
+                logger.info(
+                    "Built %s for dataset version %s in %.2f s",
+                    step, version, time.perf_counter() - started
+                )
+        finally:
+            self.building = None
+
+    def run(self):
+        while True:
+            try:
+                self.check()
+                self.error = None
+            except Exception as exc:
+                # Typically a file caught mid-write; its next write changes
+                # the signature again and the build is retried.
+                self.error = repr(exc)
+                logger.warning(
+                    "Dataset refresh failed; still serving %s: %r",
+                    self.versions.current, exc
+                )
+            time.sleep(self.interval)
+
+
+@st.cache_resource
+def load_refresher():
+    """One refresher per process, polling in a daemon thread when enabled."""
+    refresher = DatasetRefresher(load_dataset_versions())
+    if refresher.interval > 0:
+        quiet_background_threads()
+        threading.Thread(target=refresher.run, name=REFRESH_THREAD_NAME, daemon=True).start()
+    return refresher
+
+
+def use_current_dataset():
+    """Pin this run to the published dataset version.
+
+    Call at the top of every data page, before loading anything. Also
+    starts the background refresher on first use.
+    """
+    load_refresher()
+    pin_dataset_version()
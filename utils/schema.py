@@ -0,0 +1,163 @@
+import logging
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# ======================================================
+# DTYPE PLAN FOR final_dataset.csv
+# ======================================================
+# Low-cardinality text columns: stored as categoricals so filters and
+# group-bys work on small integer codes instead of Python strings.
+CATEGORY_COLUMNS = [
+    "gender",
+    "internet_service",
+    "internet_type",
+    "offer",
+    "contract",
+    "payment_method",
+    "customer_status",
+    "churn_label",
+    "churn_category",
+    "churn_reason",
+    "country",
+    "state",
+    "city",
+    "quarter",
+    "age_group",
+]
+
+# Yes/No service and demographic flags: stored as booleans.
+BOOLEAN_COLUMNS = [
+    "under_30",
+    "senior_citizen",
+    "partner",
+    "dependents",
+    "phone_service",
+    "multiple_lines",
+    "unlimited_data",
+    "referred_a_friend",
+    "online_security",
+    "online_backup",
+    "device_protection",
+    "premium_tech_support",
+    "streaming_tv",
+    "streaming_movies",
+    "streaming_music",
+    "paperless_billing",
+]
+
+# Counters and scores: smallest integer type that holds the value range.
+# They are parsed as int64 and narrowed only when every value fits, so a
+# larger value in a refreshed extract keeps the wide type instead of
+# wrapping around.
+INTEGER_COLUMNS = {
+    "age": "int8",
+    "number_of_dependents": "int8",
+    "tenure": "int8",
+    "avg_monthly_gb_download": "int16",
+    "number_of_referrals": "int8",
+    "total_extra_data_charges": "int16",
+    "satisfaction_score": "int8",
+    "cltv": "int16",
+    "churn_score": "int8",
+    "churn_value": "int8",
+    "zip_code": "int32",
+    "total_population": "int32",
+    "count": "int8",
+    "tenure_in_months": "int8",
+}
+
+# Per-customer amounts and coordinates drop to float32. Totals that feed
+# revenue KPIs stay float64 so large sums keep cent precision.
+FLOAT_COLUMNS = {
+    "monthly_charges": "float32",
+    "avg_monthly_long_distance_charges": "float32",
+    "total_charges": "float64",
+    "total_refunds": "float32",
+    "total_long_distance_charges": "float64",
+    "total_revenue": "float64",
+    "latitude": "float32",
+    "longitude": "float32",
+}
+
+# Unique identifier: Arrow-backed strings avoid one Python object per row.
+STRING_COLUMNS = {
+    "customer_id": "string[pyarrow]",
+}
+
+FLAG_TRUE = "Yes"
+FLAG_FALSE = "No"
+
+
+# ======================================================
+# TYPED READER
+# ======================================================
+def read_dtypes():
+    """Return the ``dtype`` mapping passed to ``pd.read_csv``.
+
+    Yes/No flags are read as categoricals and converted to booleans
+    afterwards, so no column is ever materialised as Python objects.
+    Integer columns are read as int64 and narrowed by ``apply_schema``.
+    """
+    dtypes = {col: "category" for col in CATEGORY_COLUMNS + BOOLEAN_COLUMNS}
+    dtypes.update({col: "int64" for col in INTEGER_COLUMNS})
+    dtypes.update(FLOAT_COLUMNS)
+    dtypes.update(STRING_COLUMNS)
+    return dtypes
+
+
+def _narrow_integers(series, dtype):
+    """``series`` as ``dtype`` if every value fits, otherwise as int64."""
+    info = np.iinfo(dtype)
+    if series.empty or (series.min() >= info.min and series.max() <= info.max):
+        return series.astype(dtype)
+    logger.warning(
+        "Column %r holds values outside %s (%s to %s); keeping int64.",
+        series.name, dtype, series.min(), series.max()
+    )
+    return series.astype("int64")
+
+
+def apply_schema(df):
+    """Normalise column names and coerce ``df`` to the declared dtypes."""
+    df.columns = df.columns.str.lower().str.strip()
+
+    for col in CATEGORY_COLUMNS:
+        if col in df.columns and not isinstance(df[col].dtype, pd.CategoricalDtype):
+            df[col] = df[col].astype("category")
+
+    for col in BOOLEAN_COLUMNS:
+        if col in df.columns and df[col].dtype != bool:
+            df[col] = df[col].astype(str).eq(FLAG_TRUE)
+
+    for col, dtype in INTEGER_COLUMNS.items():
+        if col in df.columns and df[col].dtype != dtype:
+            df[col] = _narrow_integers(df[col], dtype)
+
+    for mapping in (FLOAT_COLUMNS, STRING_COLUMNS):
+        for col, dtype in mapping.items():
+            if col in df.columns and df[col].dtype != dtype:
+                df[col] = df[col].astype(dtype)
+
+    return df
+
+
+def read_csv(path):
+    """Read ``path`` straight into the compact dtype plan."""
+    df = pd.read_csv(path, dtype=read_dtypes())
+    return apply_schema(df)
+
+
+# ======================================================
+# DISPLAY HELPERS
+# ======================================================
+def flag_labels(series):
+    """Map a boolean flag column back to the Yes/No labels used in charts."""
+    return series.map({True: FLAG_TRUE, False: FLAG_FALSE})
+
+
+def filter_options(df, column):
+    """Distinct values of ``column`` in order of appearance, for widgets."""
+    return df[column].drop_duplicates().tolist()
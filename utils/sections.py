@@ -0,0 +1,60 @@
+import functools
+import os
+
+import streamlit as st
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+# ======================================================
+# LAZY SECTION SETTINGS
+# ======================================================
+# Set CHURN_LAZY_SECTIONS=0 to render every section on page load.
+LAZY_SECTIONS = os.environ.get("CHURN_LAZY_SECTIONS", "1").lower() not in ("0", "false", "no")
+
+# Caption for collapsed sections on the filtered data pages.
+FILTER_SECTION_CAPTION = "Rendered on demand to keep filter changes fast."
+
+
+# ======================================================
+# ON-DEMAND SECTIONS
+# ======================================================
+def lazy_section(key, label, caption="Loaded on demand."):
+    """Whether a below-the-fold section should render on this run.
+
+    Call inside an ``st.fragment``: the section stays collapsed behind a
+    toggle until the user opens it, and opening it reruns only that
+    fragment. Once opened it stays open for the session, also after
+    visiting other pages. ``caption`` is shown under the toggle while the
+    section is collapsed.
+    """
+    if not LAZY_SECTIONS:
+        return True
+
+    # Widget state is dropped when the user leaves the page, so the
+    # toggle's value is kept under a key of its own.
+    opened_key = f"lazy_section_opened_{key}"
+    shown = st.toggle(
+        label,
+        value=st.session_state.get(opened_key, False),
+        key=f"lazy_section_{key}"
+    )
+    st.session_state[opened_key] = shown
+    if not shown:
+        st.caption(caption)
+    return shown
+
+
+def fragment(func):
+    """``st.fragment`` that also runs outside a session.
+
+    Streamlit skips fragment bodies when there is no script run context,
+    which would leave the cache warm-up (``utils.warmup``) without the
+    figures built inside them; there the function is simply called.
+    """
+    section = st.fragment(func)
+
+    @functools.wraps(func)
+    def run(*args, **kwargs):
+        if get_script_run_ctx(suppress_warning=True) is None:
+            return func(*args, **kwargs)
+        return section(*args, **kwargs)
+    return run
@@ -0,0 +1,255 @@
+import json
+import logging
+import os
+import runpy
+import threading
+import time
+from pathlib import Path
+
+import streamlit as st
+
+# ======================================================
+# WARM-UP SETTINGS
+# ======================================================
+# Set CHURN_WARMUP=1 to start the warm-up on the first landing-page visit
+# when the server is launched with plain `streamlit run app.py`;
+# scripts/serve.py starts it as soon as the server is up.
+WARMUP_ENABLED = os.environ.get("CHURN_WARMUP", "").lower() in ("1", "true", "yes")
+
+# Optional JSON file rewritten on every step, for container readiness
+# probes: ready once its "state" is "ready".
+WARMUP_STATUS_PATH = os.environ.get("CHURN_WARMUP_STATUS")
+
+BASE_PATH = Path(__file__).resolve().parent.parent
+WARMUP_PAGES = sorted((BASE_PATH / "pages").glob("[1-5]_*.py"))
+
+# Background threads of the app are named with this prefix.
+BACKGROUND_THREAD_PREFIX = "churn-"
+WARMUP_THREAD_NAME = f"{BACKGROUND_THREAD_PREFIX}warmup"
+
+# Loggers that complain about every Streamlit call made outside a session.
+_BARE_MODE_LOGGERS = [
+    "streamlit.runtime.scriptrunner_utils.script_run_context",
+    "streamlit.deprecation_util",
+]
+
+
+# ======================================================
+# SHARED CACHE STEPS
+# ======================================================
+# Loaders are imported per step so the landing page, which only shows the
+# progress, never imports the data stack.
+def _load_dataset():
+    from utils.data_loader import load_data
+    load_data()
+
+
+def _load_derived_tiers():
+    from utils.features import load_enriched_data
+    load_enriched_data()
+
+
+def _load_filter_index():
+    from utils.filter_index import load_filter_index
+    load_filter_index()
+
+
+def _load_cube():
+    from utils.cube import load_cube
+    load_cube()
+
+
+def _load_geo_index():
+    from utils.geo import load_geo_index
+    load_geo_index()
+
+
+def _load_query_engine():
+    from utils.query import load_query_engine
+    load_query_engine()
+
+
+def _run_page(page):
+    """Execute ``page`` outside any session to build its default view.
+
+    Without a script run context every widget returns its default value,
+    so the page computes exactly the aggregates and figures a first
+    visitor with the all-selected filters needs, and nothing is sent.
+    """
+    def run():
+        runpy.run_path(str(page), run_name="__warmup__")
+    return run
+
+
+def warmup_steps():
+    """(name, callable) pairs run in order by the warm-up thread."""
+    steps = [
+        ("dataset", _load_dataset),
+        ("derived tiers", _load_derived_tiers),
+        ("filter index", _load_filter_index),
+        ("aggregate cube", _load_cube),
+        ("geo index", _load_geo_index),
+        ("query engine", _load_query_engine),
+    ]
+    steps += [(f"page {page.name.split('_')[0]}", _run_page(page)) for page in WARMUP_PAGES]
+    return steps
+
+
+# ======================================================
+# PROGRESS / READINESS
+# ======================================================
+class WarmupStatus:
+    """Progress of the background warm-up, shared by every session."""
+
+    def __init__(self, steps, status_path=WARMUP_STATUS_PATH):
+        self.steps = list(steps)
+        self.status_path = status_path
+        self.completed = []
+        self.current = None
+        self.error = None
+        self.started_at = None
+        self.finished_at = None
+        self._lock = threading.Lock()
+
+    @property
+    def state(self):
+        if self.error is not None:
+            return "failed"
+        if self.finished_at is not None:
+            return "ready"
+        return "running" if self.started_at is not None else "pending"
+
+    def start(self):
+        """Mark the warm-up started; False if it already was."""
+        with self._lock:
+            if self.started_at is not None:
+                return False
+            self.started_at = time.time()
+        self._write()
+        return True
+
+    def begin(self, step):
+        self.current = step
+        self._write()
+
+    def complete(self, step, seconds):
+        self.completed.append({"step": step, "seconds": round(seconds, 3)})
+        self.current = None
+        self._write()
+
+    def fail(self, step, error):
+        self.error = f"{step}: {error!r}"
+        self.current = None
+        self._write()
+
+    def finish(self):
+        self.finished_at = time.time()
+        self._write()
+
+    def as_record(self):
+        return {
+            "state": self.state,
+            "progress": len(self.completed) / len(self.steps) if self.steps else 1.0,
+            "current": self.current,
+            "completed": list(self.completed),
+            "steps": self.steps,
+            "error": self.error,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+        }
+
+    def _write(self):
+        if not self.status_path:
+            return
+        # Write then rename so a probe never reads a half-written file.
+        partial = f"{self.status_path}.partial"
+        with open(partial, "w", encoding="utf-8") as handle:
+            json.dump(self.as_record(), handle)
+        os.replace(partial, self.status_path)
+
+
+@st.cache_resource
+def load_warmup_status():
+    """The warm-up progress of this process."""
+    return WarmupStatus(name for name, _ in warmup_steps())
+
+
+# ======================================================
+# BACKGROUND THREAD
+# ======================================================
+class _BackgroundThreadFilter(logging.Filter):
+    def filter(self, record):
+        return not record.threadName.startswith(BACKGROUND_THREAD_PREFIX)
+
+
+_background_filter = _BackgroundThreadFilter()
+
+
+def quiet_background_threads():
+    """Drop Streamlit's no-session warnings logged by the app's own threads."""
+    for name in _BARE_MODE_LOGGERS:
+        logger = logging.getLogger(name)
+        if _background_filter not in logger.filters:
+            logger.addFilter(_background_filter)
+
+
+def _run_steps(status):
+    for step, run in warmup_steps():
+        status.begin(step)
+        started = time.perf_counter()
+        try:
+            run()
+        except Exception as exc:
+            # A page that cannot warm up must not take the server down;
+            # sessions build whatever is missing on demand.
+            logging.getLogger(__name__).exception("Warm-up step %r failed", step)
+            status.fail(step, exc)
+            return
+        status.complete(step, time.perf_counter() - started)
+    status.finish()
+
+
+def _run_warmup(wait_for_server):
+    if wait_for_server:
+        from streamlit.runtime import Runtime
+
+        while not Runtime.exists():
+            time.sleep(0.1)
+
+    status = load_warmup_status()
+    if status.start():
+        _run_steps(status)
+
+
+def start_warmup(wait_for_server=False):
+    """Run the warm-up in a daemon thread, once per process.
+
+    Returns immediately; the server keeps answering health checks while
+    the caches fill. With ``wait_for_server`` the thread first waits for
+    the Streamlit runtime, so a launcher can call this before the server
+    has read its configuration.
+    """
+    if not wait_for_server and load_warmup_status().state != "pending":
+        return
+    quiet_background_threads()
+    threading.Thread(
+        target=_run_warmup,
+        args=(wait_for_server,),
+        name=WARMUP_THREAD_NAME,
+        daemon=True
+    ).start()
+
+
+def render_warmup_status():
+    """Show warm-up progress while it runs, or its failure."""
+    status = load_warmup_status()
+    record = status.as_record()
+    if record["state"] == "running":
+        done = len(record["completed"])
+        current = record["current"] or "starting"
+        st.progress(
+            record["progress"],
+            text=f"Warming up dashboard caches: {current} ({done}/{len(record['steps'])})"
+        )
+    elif record["state"] == "failed":
+        st.caption(f"Cache warm-up stopped at {record['error']}; pages build on demand.")